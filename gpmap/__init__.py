@@ -3,5 +3,6 @@ __version__ = '0.1'
 
 # Import the main module in this package
 from gpmap.gpm import GenotypePhenotypeMap
+from gpmap.space import GenotypeSpace
 
 from .__version__ import __version__
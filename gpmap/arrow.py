@@ -0,0 +1,176 @@
+__doc__ = """Convert genotype-phenotype maps to and from Apache Arrow tables, for
+Parquet and Feather (Arrow IPC) files. Requires the optional `pyarrow`
+package.
+
+Data columns are stored as typed columns, along with the precomputed
+`n_mutations` and `codes` columns and the packed binary representation (one
+fixed-size binary value per genotype). The wildtype, mutations, site labels
+and metadata of the map are stored in the schema metadata, so a map can be
+read back without passing them again, and without encoding any genotype.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import gpmap.utils as utils
+
+
+# Key of the map's header in the schema metadata.
+METADATA_KEY = b"gpmap"
+
+# Columns that are always read, whatever columns are requested.
+REQUIRED_COLUMNS = ["genotypes", "binary_packed", "n_mutations", "codes"]
+
+
+def import_pyarrow():
+    """Import pyarrow, with a helpful error if it is not installed."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Reading and writing Parquet/Feather files requires "
+                          "`pyarrow`. Install it before using this method.")
+    return pyarrow
+
+
+def map_to_table(gpm):
+    """Convert a GenotypePhenotypeMap to a pyarrow.Table.
+
+    The string `binary` column is not stored; it is rebuilt from the packed
+    binary representation on read.
+    """
+    pa = import_pyarrow()
+
+    columns = {}
+    for name in gpm.data.columns:
+        if name in ("binary", "n_mutations", "codes"):
+            continue
+        values = gpm.data[name].to_numpy()
+        if name == "genotypes":
+            columns[name] = pa.array(values.astype(str), type=pa.string())
+        elif name == "stdeviations" and values.dtype == object:
+            # Missing standard deviations are stored as nulls.
+            if all(v is None for v in values):
+                columns[name] = pa.nulls(len(values), type=pa.float64())
+            else:
+                columns[name] = pa.array(values, type=pa.float64(),
+                                         from_pandas=True)
+        else:
+            columns[name] = pa.array(values, from_pandas=True)
+
+    packed = np.ascontiguousarray(gpm.binary_packed)
+    columns["binary_packed"] = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(max(packed.shape[1], 1)),
+        len(packed),
+        [None, pa.py_buffer(_pad(packed).tobytes())])
+    columns["n_mutations"] = pa.array(gpm.n_mutations.astype(np.int64))
+    if gpm._codes_fit():
+        columns["codes"] = pa.array(gpm.codes.astype(np.int64))
+
+    header = {
+        "wildtype": gpm.wildtype,
+        "mutations": gpm.mutations,
+        "site_labels": gpm._site_labels,
+        "include_binary": gpm._include_binary,
+        "binary_width": gpm.binary_matrix.shape[1],
+        "metadata": gpm.metadata,
+    }
+    table = pa.table(columns)
+    return table.replace_schema_metadata(
+        {METADATA_KEY: json.dumps(header).encode("utf-8")})
+
+
+def _pad(packed):
+    """Make sure every genotype has at least one byte (fixed-size binary
+    values can't be empty)."""
+    if packed.shape[1] > 0:
+        return packed
+    return np.zeros((len(packed), 1), dtype=np.uint8)
+
+
+def read_header(schema):
+    """Read the map's header from a pyarrow schema."""
+    metadata = schema.metadata or {}
+    if METADATA_KEY not in metadata:
+        raise Exception("The file does not contain a GenotypePhenotypeMap.")
+    return json.loads(metadata[METADATA_KEY].decode("utf-8"))
+
+
+def project(columns, schema):
+    """Columns to read for a given projection: the requested data columns
+    plus the columns needed to rebuild the map."""
+    if columns is None:
+        return None
+    names = list(REQUIRED_COLUMNS)
+    names += [c for c in columns if c not in names]
+    return [c for c in schema.names if c in names]
+
+
+def table_to_map(cls, table, header=None, **kwargs):
+    """Convert a pyarrow.Table written by `map_to_table` to a
+    GenotypePhenotypeMap, without encoding the genotypes again. Keyword
+    arguments override the header stored in the table; if they change the
+    wildtype, mutations or site labels, the genotypes are encoded again.
+    """
+    if header is None:
+        header = read_header(table.schema)
+    reencode = utils.encoding_overridden(header, kwargs)
+    header = dict(header, **kwargs)
+    n = table.num_rows
+
+    def column(name):
+        values = table.column(name)
+        if name == "stdeviations" and values.null_count == n and n > 0:
+            return np.full(n, None, dtype=object)
+        return values.to_numpy()
+
+    # Data columns, in the usual order.
+    data = {}
+    data["genotypes"] = column("genotypes").astype(str)
+    if "phenotypes" in table.column_names:
+        data["phenotypes"] = column("phenotypes")
+    else:
+        data["phenotypes"] = np.full(n, np.nan)
+    if "n_replicates" in table.column_names:
+        data["n_replicates"] = column("n_replicates")
+    else:
+        data["n_replicates"] = np.ones(n, dtype=np.int64)
+    if "stdeviations" in table.column_names:
+        data["stdeviations"] = column("stdeviations")
+    else:
+        data["stdeviations"] = np.full(n, None, dtype=object)
+    data["n_mutations"] = column("n_mutations")
+    if "codes" in table.column_names:
+        data["codes"] = column("codes")
+    for name in table.column_names:
+        if name not in data and name not in REQUIRED_COLUMNS:
+            data[name] = column(name)
+
+    if reencode:
+        # Stored encodings don't match the new wildtype/mutations.
+        return cls._from_columns(
+            header["wildtype"],
+            data,
+            header["mutations"],
+            site_labels=header.get("site_labels"),
+            include_binary=header.get("include_binary", False),
+            metadata=header.get("metadata", {}))
+
+    # Packed binary representation.
+    width = header["binary_width"]
+    nbytes = max(1, (width + 7) // 8)
+    packed = table.column("binary_packed").combine_chunks()
+    buffer = np.frombuffer(packed.buffers()[1], dtype=np.uint8)
+    start = packed.offset * nbytes
+    packed = buffer[start:start + n * nbytes].reshape(n, nbytes)
+    packed = packed[:, :(width + 7) // 8].copy()
+
+    return cls._from_data(
+        header["wildtype"],
+        pd.DataFrame(data),
+        header["mutations"],
+        site_labels=header.get("site_labels"),
+        include_binary=header.get("include_binary", False),
+        metadata=header.get("metadata", {}),
+        cache={"binary_packed": packed, "binary_width": width})
@@ -0,0 +1,199 @@
+__doc__ = """Stream large csv files into genotype-phenotype maps.
+
+The file is read `chunksize` rows at a time. Genotypes are kept as one byte
+per site, and every chunk is copied into typed arrays that are sized from an
+estimate of the number of rows (the bytes per row read so far) and grown if
+the estimate was short. Memory stays close to the size of the final arrays,
+whatever the size of the file.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import gpmap.utils as utils
+
+
+# Columns read from the file, with their types.
+DTYPES = dict(
+    genotypes=str,
+    phenotypes=float,
+    stdeviations=float,
+    n_replicates=int
+)
+
+
+class _ChunkEncoder(object):
+    """Encode chunks of genotypes (as arrays of character codes) into
+    preallocated packed binary and integer code arrays."""
+
+    def __init__(self, wildtype, mutations, site_labels, size):
+        self.wildtype = wildtype
+        self.mutations = mutations
+        self.encoding_table = utils.get_encoding_table(wildtype, mutations,
+                                                       site_labels)
+        self.lookup, self.width = utils.get_encoding_lookup(
+            self.encoding_table)
+        self.packed = np.empty((size, (self.width + 7) // 8), dtype=np.uint8)
+        # No integer codes for spaces that are too large.
+        self.codes = None
+        if utils.codes_fit(mutations, wildtype=wildtype):
+            self.codes = np.empty(size, dtype=np.int64)
+
+    def resize(self, size):
+        self.packed = np.resize(self.packed, (size, self.packed.shape[1]))
+        if self.codes is not None:
+            self.codes = np.resize(self.codes, size)
+
+    def encode(self, chars, start):
+        """Encode a chunk of genotypes starting at row `start`. Raises a
+        KeyError for letters that are not in the mutations dictionary."""
+        stop = start + len(chars)
+        binary = utils.array_to_binary(chars, self.encoding_table)
+        self.packed[start:stop] = np.packbits(binary, axis=1)
+        if self.codes is not None:
+            self.codes[start:stop] = utils.array_to_codes(
+                chars, self.mutations, wildtype=self.wildtype)
+
+
+def read_csv(cls, fname, wildtype, chunksize, progress=None, mutations=None,
+             site_labels=None, include_binary=False, lazy=False, **kwargs):
+    """Stream a csv file into a map, one chunk of rows at a time.
+
+    If `mutations` is given, every chunk is validated and encoded as it
+    arrives. Otherwise, the letters seen at each site are collected chunk by
+    chunk, and the genotypes are encoded (in chunks) once the mutations are
+    known.
+
+    Parameters
+    ----------
+    fname : str or file
+        csv file with 'genotypes', 'phenotypes', 'stdeviations' and
+        'n_replicates' columns.
+    wildtype : str
+        reference genotype.
+    chunksize : int
+        number of rows read at a time.
+    progress : callable (optional)
+        called as ``progress(rows_read, total_rows)`` after each chunk. The
+        total is estimated from the bytes read so far (None for file objects
+        of unknown size), and is exact on the last call.
+
+    Other keyword arguments are passed to GenotypePhenotypeMap.
+    """
+    length = len(wildtype)
+    if isinstance(fname, str):
+        f = open(fname, "rb")
+        size = os.path.getsize(fname)
+    else:
+        f = fname
+        size = None
+
+    arrays = None
+    if mutations is not None:
+        mutations = dict([(int(key), val) for key, val in mutations.items()])
+    else:
+        seen = np.zeros((length, 128), dtype=bool)
+
+    n = 0
+    total = None
+    try:
+        reader = pd.read_csv(f, dtype=DTYPES, chunksize=chunksize,
+                             usecols=lambda col: col in DTYPES)
+        for chunk in reader:
+            m = len(chunk)
+            if size is not None:
+                # Rows in the file, from the bytes per row read so far.
+                total = max(n + m, int((n + m) * size / max(f.tell(), 1)))
+
+            # Allocate (or grow) typed arrays for the estimated rows.
+            capacity = 0 if arrays is None else len(arrays["phenotypes"])
+            if n + m > capacity:
+                capacity = max(2 * capacity, n + m, total or 0)
+                if arrays is None:
+                    arrays = dict(
+                        chars=np.empty((capacity, length), dtype=np.uint8),
+                        phenotypes=np.empty(capacity, dtype=float),
+                        stdeviations=np.empty(capacity, dtype=float),
+                        n_replicates=np.empty(capacity, dtype=np.int64),
+                    )
+                    if mutations is not None:
+                        encoder = _ChunkEncoder(wildtype, mutations,
+                                                site_labels, capacity)
+                else:
+                    for key, value in arrays.items():
+                        arrays[key] = np.resize(
+                            value, (capacity,) + value.shape[1:])
+                    if mutations is not None:
+                        encoder.resize(capacity)
+
+            chars = utils.genotypes_to_array(chunk.genotypes.to_numpy())
+            if chars.shape[1] != length:
+                raise Exception("Genotypes are not the same length as the "
+                                "wildtype.")
+            if chars.size > 0 and chars.max() > 127:
+                raise Exception("Genotypes must be ASCII characters.")
+            chars = chars.astype(np.uint8)
+            arrays["chars"][n:n + m] = chars
+
+            arrays["phenotypes"][n:n + m] = chunk.phenotypes.to_numpy()
+            if "stdeviations" in chunk:
+                arrays["stdeviations"][n:n + m] = chunk.stdeviations.to_numpy()
+            else:
+                arrays["stdeviations"][n:n + m] = np.nan
+            if "n_replicates" in chunk:
+                arrays["n_replicates"][n:n + m] = chunk.n_replicates.to_numpy()
+            else:
+                arrays["n_replicates"][n:n + m] = 1
+
+            if mutations is not None:
+                encoder.encode(chars, n)
+            else:
+                sites = np.broadcast_to(np.arange(length), chars.shape)
+                seen[sites, chars] = True
+
+            n += m
+            if progress is not None:
+                progress(n, total)
+    finally:
+        if f is not fname:
+            f.close()
+
+    if arrays is None:
+        raise Exception("The csv file has no rows.")
+
+    # Infer mutations from the letters seen at each site, then encode.
+    if mutations is None:
+        mutations = dict((site, [chr(c) for c in np.flatnonzero(row)])
+                         for site, row in enumerate(seen))
+        encoder = _ChunkEncoder(wildtype, mutations, site_labels, n)
+        for start in range(0, n, chunksize):
+            stop = min(start + chunksize, n)
+            encoder.encode(arrays["chars"][start:stop], start)
+
+    chars = arrays["chars"][:n]
+    data = pd.DataFrame(dict(
+        genotypes=chars.view("S%d" % length).ravel().astype(str),
+        phenotypes=arrays["phenotypes"][:n],
+        n_replicates=arrays["n_replicates"][:n],
+        stdeviations=arrays["stdeviations"][:n],
+    ))
+    packed = encoder.packed[:n]
+    data["n_mutations"] = utils.count_bits(packed, axis=1)
+    if encoder.codes is not None:
+        data["codes"] = encoder.codes[:n]
+
+    return cls._from_data(
+        wildtype,
+        data,
+        mutations,
+        site_labels=site_labels,
+        include_binary=include_binary,
+        lazy=lazy,
+        metadata=kwargs,
+        cache={
+            "encoding_table": encoder.encoding_table,
+            "binary_packed": packed,
+            "binary_width": encoder.width,
+        })
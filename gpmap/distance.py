@@ -0,0 +1,210 @@
+__doc__ = """Hamming distances between sets of genotypes.
+
+All functions accept genotypes as a list of strings, as a 2d array of
+character/letter codes (see `utils.genotypes_to_array`), or, with
+`packed=True`, as a 2d array of bits packed into uint8 words (see
+`GenotypePhenotypeMap.binary_packed`). Distances on packed bits are computed
+with XOR + popcount. Note that on packed binary representations of
+multi-letter alphabets, two different mutations at the same site are 2 bits
+apart.
+
+Distances are computed in tiles of at most `block_size` genotype pairs, so
+memory stays bounded, and tiles can be spread across `n_jobs` threads.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from gpmap import utils
+
+
+# Default number of genotype pairs compared per tile.
+BLOCK_SIZE = 2**16
+
+
+def _as_matrix(genotypes):
+    """Convert genotypes to a 2d array. Returns the array and whether a single
+    genotype was given."""
+    if isinstance(genotypes, str):
+        return utils.genotypes_to_array([genotypes]), True
+
+    array = np.asarray(genotypes)
+    if array.dtype.kind in ('U', 'S', 'O'):
+        return utils.genotypes_to_array(array), False
+    if array.ndim == 1:
+        return array.reshape(1, -1), True
+    return array, False
+
+
+def _tiles(n, m, block_size):
+    """Split an (n, m) matrix of genotype pairs into tiles with at most
+    `block_size` pairs."""
+    block_size = max(int(block_size), 1)
+    cols = min(max(m, 1), block_size)
+    rows = max(1, block_size // cols)
+    tiles = []
+    for i in range(0, n, rows):
+        for j in range(0, m, cols):
+            tiles.append((slice(i, min(i + rows, n)),
+                          slice(j, min(j + cols, m))))
+    return tiles
+
+
+def _distance(a, b, packed):
+    """Distance matrix between all rows of `a` and all rows of `b`."""
+    if packed:
+        return utils.count_bits(a[:, None, :] ^ b[None, :, :], axis=-1)
+    return np.count_nonzero(a[:, None, :] != b[None, :, :], axis=-1)
+
+
+def _map_tiles(function, tiles, n_jobs):
+    """Apply function to every tile, optionally in a thread pool."""
+    if n_jobs is None or n_jobs == 1:
+        return [function(tile) for tile in tiles]
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(function, tiles))
+
+
+def hamming(genotypes1, genotypes2=None, packed=False,
+            block_size=BLOCK_SIZE, n_jobs=1):
+    """Hamming distance matrix between two sets of genotypes.
+
+    Parameters
+    ----------
+    genotypes1 : str or array-like
+        genotype or set of genotypes.
+    genotypes2 : array-like (optional)
+        set of genotypes. If None, distances within `genotypes1` are computed.
+    packed : bool (default=False)
+        genotypes are given as packed bits.
+    block_size : int
+        maximum number of genotype pairs compared at a time.
+    n_jobs : int
+        number of threads.
+
+    Returns
+    -------
+    distances : numpy.ndarray
+        (n1, n2) matrix of distances, or a (n2,) array if `genotypes1` is a
+        single genotype.
+    """
+    a, single = _as_matrix(genotypes1)
+    if genotypes2 is None:
+        b = a
+    else:
+        b, _ = _as_matrix(genotypes2)
+
+    distances = np.empty((len(a), len(b)), dtype=np.int64)
+
+    def tile_distance(tile):
+        rows, cols = tile
+        distances[rows, cols] = _distance(a[rows], b[cols], packed)
+
+    _map_tiles(tile_distance, _tiles(len(a), len(b), block_size), n_jobs)
+    if single:
+        return distances[0]
+    return distances
+
+
+def within(genotypes1, genotypes2, distance, packed=False,
+           block_size=BLOCK_SIZE, n_jobs=1):
+    """Find all pairs of genotypes within a Hamming distance of each other,
+    without building the full distance matrix.
+
+    Parameters
+    ----------
+    genotypes1 : str or array-like
+        genotype or set of query genotypes.
+    genotypes2 : array-like
+        set of genotypes to search.
+    distance : int
+        maximum distance (inclusive).
+
+    Returns
+    -------
+    index1 : numpy.ndarray
+        position of the query genotype in each pair (omitted if a single
+        genotype is given).
+    index2 : numpy.ndarray
+        position of the found genotype in each pair.
+    distances : numpy.ndarray
+        distance of each pair.
+
+    Pairs are sorted by query and then by position in `genotypes2`.
+    """
+    a, single = _as_matrix(genotypes1)
+    b, _ = _as_matrix(genotypes2)
+
+    def tile_within(tile):
+        rows, cols = tile
+        d = _distance(a[rows], b[cols], packed)
+        i, j = np.nonzero(d <= distance)
+        return i + rows.start, j + cols.start, d[i, j]
+
+    results = _map_tiles(tile_within, _tiles(len(a), len(b), block_size),
+                         n_jobs)
+    index1 = np.concatenate([r[0] for r in results] + [np.empty(0, int)])
+    index2 = np.concatenate([r[1] for r in results] + [np.empty(0, int)])
+    distances = np.concatenate([r[2] for r in results] + [np.empty(0, int)])
+
+    order = np.lexsort((index2, index1))
+    index1, index2, distances = index1[order], index2[order], distances[order]
+    if single:
+        return index2, distances
+    return index1, index2, distances
+
+
+def nearest(genotypes1, genotypes2, k=1, packed=False,
+            block_size=BLOCK_SIZE, n_jobs=1):
+    """Find the `k` genotypes in `genotypes2` closest to each genotype in
+    `genotypes1`, without building the full distance matrix. Ties are broken
+    arbitrarily.
+
+    Returns
+    -------
+    index : numpy.ndarray
+        (n1, k) positions in `genotypes2`, sorted by distance (a (k,) array
+        if a single genotype is given).
+    distances : numpy.ndarray
+        distance of each neighbor.
+    """
+    a, single = _as_matrix(genotypes1)
+    b, _ = _as_matrix(genotypes2)
+    k = min(k, len(b))
+
+    # Run each block of query rows through all of genotypes2, keeping only
+    # the k best so far.
+    tiles = _tiles(len(a), len(b), block_size)
+    row_blocks = sorted(set((t[0].start, t[0].stop) for t in tiles))
+    col_blocks = sorted(set((t[1].start, t[1].stop) for t in tiles))
+
+    def block_nearest(row_block):
+        rows = slice(*row_block)
+        best_index = np.empty((rows.stop - rows.start, 0), dtype=np.int64)
+        best_dist = np.empty((rows.stop - rows.start, 0), dtype=np.int64)
+        for col_block in col_blocks:
+            cols = slice(*col_block)
+            d = _distance(a[rows], b[cols], packed)
+            index = np.broadcast_to(np.arange(cols.start, cols.stop), d.shape)
+            best_dist = np.concatenate([best_dist, d], axis=1)
+            best_index = np.concatenate([best_index, index], axis=1)
+            if best_dist.shape[1] > k:
+                keep = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+                best_dist = np.take_along_axis(best_dist, keep, axis=1)
+                best_index = np.take_along_axis(best_index, keep, axis=1)
+        return best_index, best_dist
+
+    results = _map_tiles(block_nearest, row_blocks, n_jobs)
+    index = np.concatenate([r[0] for r in results]
+                           + [np.empty((0, k), dtype=np.int64)], axis=0)
+    distances = np.concatenate([r[1] for r in results]
+                               + [np.empty((0, k), dtype=np.int64)], axis=0)
+
+    # Sort neighbors by distance, then position.
+    order = np.lexsort((index, distances), axis=1)
+    index = np.take_along_axis(index, order, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+    if single:
+        return index[0], distances[0]
+    return index, distances
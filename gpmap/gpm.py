@@ -5,6 +5,7 @@
 # Outside imports
 # ----------------------------------------------------------
 
+import io
 import json
 import pickle
 import numpy as np
@@ -17,6 +18,17 @@ import pandas as pd
 # import different maps into this module
 import gpmap.utils as utils
 import gpmap.errors as errors
+import gpmap.arrow as arrow
+import gpmap.csvfile as csvfile
+import gpmap.jsonfile as jsonfile
+import gpmap.store as store
+from gpmap.space import GenotypeSpace
+from gpmap.views import CompleteDataView, MissingDataView
+
+
+def _unpickle_map(cls, header, arrays, encoding_table):
+    """Rebuild a map pickled by `GenotypePhenotypeMap.__reduce_ex__`."""
+    return store.arrays_to_map(cls, header, arrays, encoding_table)
 
 
 class GenotypePhenotypeMap(object):
@@ -47,8 +59,17 @@ class GenotypePhenotypeMap(object):
     n_replicates : int
         number of replicate measurements comprising the mean phenotypes
 
-    include_binary : bool (default=True)
-        Construct a binary representation of the space.
+    include_binary : bool (default=False)
+        Also store the binary representation of each genotype as a column of
+        strings in `data`. The packed binary representation
+        (`binary_packed`) is always built; by default, the strings are only
+        derived from it on demand (see `binary`).
+
+    lazy : bool (default=False)
+        If True, the encoding table, binary representation, number of
+        mutations, integer codes and error maps are not built at
+        initialization, but on first access. Either way, they are rebuilt
+        when `wildtype` or `data` is reassigned.
 
     Attributes
     ----------
@@ -56,18 +77,26 @@ class GenotypePhenotypeMap(object):
         The core data object. Columns are 'genotypes', 'phenotypes',
         'n_replicates', 'stdeviations', and (option) 'binary'.
 
-    complete_data : pandas.DataFrame (optional, created by BinaryMap)
-        A dataframe mapping the complete set of genotypes possible, given
+    complete_data : CompleteDataView
+        A lazy view mapping the complete set of genotypes possible, given
         the mutations dictionary. Contains all columns in `data`. Any missing
-        data is reported as NaN.
+        data is reported as NaN. Iterate over it in chunks or materialize it
+        with `to_dataframe`.
 
-    missing_data : pandas.DataFrame (optional, created by BinaryMap)
-        A dataframe containing the set of missing genotypes; complte_data -
+    missing_data : MissingDataView
+        A lazy view containing the set of missing genotypes; complte_data -
         data. Two columns: 'genotypes' and 'binary'.
 
-    binary : BinaryMap
-        object that gives you (the user) access to the binary representation
-        of the map.
+    binary : numpy.ndarray
+        binary representation of each genotype as a string of 0s and 1s.
+
+    binary_packed : numpy.ndarray
+        binary representation of the map packed into bits (see
+        `numpy.packbits`); one row of uint8 words per genotype.
+
+    binary_matrix : numpy.ndarray
+        binary representation of the map as a (n, width) matrix of 0s and
+        1s.
 
     encoding_table:
         Pandas DataFrame showing how mutations map to binary representation.
@@ -79,11 +108,13 @@ class GenotypePhenotypeMap(object):
                  mutations=None,
                  site_labels=None,
                  n_replicates=1,
+                 include_binary=False,
+                 lazy=False,
                  **kwargs):
 
         # Assign dummy phenotypes
         if phenotypes is None:
-            phenotypes = np.zeros(len(genotypes),dtype=np.float)
+            phenotypes = np.zeros(len(genotypes), dtype=float)
             phenotypes[:] = np.nan
 
         # Set mutations; if not given, assume binary space.
@@ -99,11 +130,15 @@ class GenotypePhenotypeMap(object):
 
         # Leftover kwargs become metadata that is ignored.
         self.metadata = kwargs
+        self._site_labels = site_labels
+        self._include_binary = include_binary
+        self._lazy = lazy
 
         # Set wildtype.
         self._wildtype = wildtype
 
-        # Store data in DataFrame
+        # Store data in DataFrame. This builds all derived structures, unless
+        # the map is lazy.
         data = dict(
             genotypes=genotypes,
             phenotypes=phenotypes,
@@ -112,22 +147,148 @@ class GenotypePhenotypeMap(object):
         )
         self.data = pd.DataFrame(data)
 
-        # Construct a lookup table for all mutations.
-        self.encoding_table = utils.get_encoding_table(
-            self.wildtype,
-            self.mutations,
-            site_labels
-        )
+    def _reset(self):
+        """Clear all structures derived from the data, wildtype and mutations.
+        If the map is not lazy, rebuild them immediately.
+        """
+        self._cache = {}
+        derived = [col for col in self._derived_columns if col in self.data]
+        if len(derived) > 0:
+            self._data = self.data.drop(columns=derived)
 
+        if not self._lazy:
+            self._build()
+
+    def _build(self):
+        """Build all derived structures."""
         # Add binary representation
         self.add_binary()
-        
+
         # Add number of mutations
         self.add_n_mutations()
 
+        # Add integer codes, if the genotype space is small enough.
+        if self._codes_fit():
+            self.add_codes()
+
         # Construct the error maps
         self._add_error()
 
+    # Columns in data that are derived from the genotypes.
+    _derived_columns = ["binary", "n_mutations", "codes"]
+
+    # Arrays that columns are read from before `data` is built (see `open`).
+    _source = None
+
+    @classmethod
+    def _from_data(cls, wildtype, data, mutations, site_labels=None,
+                   include_binary=False, lazy=False, metadata=None,
+                   cache=None):
+        """Construct a map from a DataFrame that may already hold derived
+        columns, and a cache that may already hold derived structures (e.g.
+        `binary_packed` and `binary_width`). Only what is missing is built,
+        so nothing is encoded twice. `data` is None for maps read from
+        source arrays (see `_from_source`).
+        """
+        self = cls.__new__(cls)
+        self._mutations = dict([(int(key), val)
+                                for key, val in mutations.items()])
+        self.metadata = metadata or {}
+        self._site_labels = site_labels
+        self._include_binary = include_binary
+        self._lazy = lazy
+        self._wildtype = wildtype
+        self._data = data
+        self._cache = dict(cache or {})
+        if data is None:
+            self._add_error()
+            return self
+
+        if "codes" in data:
+            self._cache["code_index"] = pd.Index(data.codes.values)
+        if not lazy:
+            if "binary_packed" not in self._cache:
+                self.add_binary()
+            elif include_binary and "binary" not in data:
+                # Keep the usual column order: binary before n_mutations.
+                loc = len(data.columns)
+                if "n_mutations" in data:
+                    loc = data.columns.get_loc("n_mutations")
+                data.insert(loc, "binary",
+                            utils.binary_to_strings(self.binary_matrix))
+            if "n_mutations" not in data:
+                self.add_n_mutations()
+            if "codes" not in data and self._codes_fit():
+                self.add_codes()
+        self._add_error()
+        return self
+
+    @classmethod
+    def _from_source(cls, wildtype, source, mutations, site_labels=None,
+                     include_binary=False, metadata=None, cache=None):
+        """Construct a map whose columns are read from a dictionary of
+        arrays (e.g. memory-mapped by `open`), which must hold every data
+        column plus `n_mutations`, `codes` and `binary_packed`. The `data`
+        DataFrame is only built from them when it is accessed.
+        """
+        self = cls._from_data(wildtype, None, mutations,
+                              site_labels=site_labels,
+                              include_binary=include_binary,
+                              metadata=metadata, cache=cache)
+        self._source = source
+        return self
+
+    # Attributes that hold the data, encoding and derived structures of the
+    # map. Other attributes (e.g. those of simulations) are carried over as
+    # is by pickling and `subset`.
+    _map_attributes = ["_wildtype", "_mutations", "_site_labels",
+                           "_include_binary", "metadata", "_data", "_source",
+                           "_cache"]
+
+    def __reduce_ex__(self, protocol):
+        """Pickle the map as typed arrays (see `store.map_to_arrays`) instead
+        of a DataFrame of Python objects and the error maps. Object columns
+        are pickled as object arrays, unchanged.
+
+        With protocol 5, the typed arrays can be sent out-of-band (see
+        `pickle.PickleBuffer`), so sending a map to another process copies
+        little more than its raw buffers. On unpickling, columns are read
+        from the arrays and everything else (the `data` DataFrame, error
+        maps, etc.) is rebuilt lazily. Other attributes, e.g. those of
+        simulations, are pickled as usual.
+        """
+        header, arrays = store.map_to_arrays(self, objects=True)
+        state = dict((key, value) for key, value in self.__dict__.items()
+                     if key not in self._map_attributes)
+        args = (type(self), header, arrays, self.encoding_table)
+        return _unpickle_map, args, state
+
+    @classmethod
+    def _from_columns(cls, wildtype, columns, mutations, site_labels=None,
+                      include_binary=False, metadata=None):
+        """Construct a map from a dictionary of data column arrays, encoding
+        the genotypes again, e.g. when a stored map is read with a new
+        wildtype or mutations (see `utils.encoding_overridden`). Derived
+        columns in `columns` are ignored.
+        """
+        n = len(columns["genotypes"])
+        data = pd.DataFrame(dict(
+            genotypes=np.asarray(columns["genotypes"]).astype(str),
+            phenotypes=columns.get("phenotypes", np.full(n, np.nan)),
+            n_replicates=columns.get("n_replicates", np.ones(n, dtype=int)),
+            stdeviations=columns.get("stdeviations",
+                                     np.full(n, None, dtype=object)),
+        ))
+        self = cls._from_data(wildtype, data, mutations,
+                              site_labels=site_labels,
+                              include_binary=include_binary,
+                              metadata=metadata)
+        for name, values in columns.items():
+            if name not in self.data and name not in ("binary_packed",
+                                                      "binary"):
+                self.data[name] = np.asarray(values)
+        return self
+
     def _repr_html_(self):
         """Represent the GenotypePhenotypeMap as an html table."""
         return self.data.to_html()
@@ -162,8 +323,31 @@ class GenotypePhenotypeMap(object):
         return self
 
     @classmethod
-    def read_csv(cls, fname, wildtype, **kwargs):
-        """"""
+    def read_csv(cls, fname, wildtype, chunksize=None, progress=None,
+                 **kwargs):
+        """Read a genotype-phenotype map from a csv file.
+
+        Parameters
+        ----------
+        fname : str
+            csv file with 'genotypes', 'phenotypes', 'stdeviations' and
+            'n_replicates' columns.
+        wildtype : str
+            reference genotype.
+        chunksize : int (optional)
+            if given, stream the file `chunksize` rows at a time. Each chunk
+            is encoded as it arrives into preallocated arrays, so memory
+            stays bounded (see `gpmap.csvfile`).
+        progress : callable (optional)
+            when streaming, called as ``progress(rows_read, total_rows)``
+            after each chunk (see `csvfile.read_csv`).
+
+        Keyword arguments are passed to GenotypePhenotypeMap.
+        """
+        if chunksize is not None:
+            return csvfile.read_csv(cls, fname, wildtype, chunksize,
+                                    progress=progress, **kwargs)
+
         dtypes = dict(
             genotypes=str,
             phenotypes=float,
@@ -187,20 +371,91 @@ class GenotypePhenotypeMap(object):
         self = cls.read_dataframe(df, wildtype, **kwargs)
         return self
 
+    @classmethod
+    def read_parquet(cls, filename, columns=None, filters=None, **kwargs):
+        """Read a GenotypePhenotypeMap from a Parquet file written by
+        `to_parquet`. No genotype is encoded again.
+
+        Parameters
+        ----------
+        filename : str
+            Parquet file.
+        columns : list (optional)
+            data columns to read (e.g. ['phenotypes']). Genotypes and their
+            binary representation and codes are always read.
+        filters : list (optional)
+            row filters, passed to `pyarrow.parquet.read_table`, e.g.
+            ``[("n_mutations", "<=", 2)]``. Row groups that can't match are
+            skipped.
+
+        Keyword arguments override the wildtype, mutations, etc. stored in
+        the file.
+        """
+        arrow.import_pyarrow()
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(filename)
+        table = pq.read_table(filename,
+                              columns=arrow.project(columns, schema),
+                              filters=filters)
+        return arrow.table_to_map(cls, table, arrow.read_header(schema),
+                                  **kwargs)
+
+    @classmethod
+    def read_feather(cls, filename, columns=None, memory_map=True,
+                     **kwargs):
+        """Read a GenotypePhenotypeMap from a Feather (Arrow IPC) file
+        written by `to_feather`. No genotype is encoded again.
+
+        Parameters
+        ----------
+        filename : str
+            Feather file.
+        columns : list (optional)
+            data columns to read (see `read_parquet`).
+        memory_map : bool (default=True)
+            memory-map the file instead of reading it.
+        """
+        pa = arrow.import_pyarrow()
+        import pyarrow.feather as feather
+        with pa.ipc.open_file(pa.memory_map(filename)) as reader:
+            schema = reader.schema
+        table = feather.read_table(filename,
+                                   columns=arrow.project(columns, schema),
+                                   memory_map=memory_map)
+        return arrow.table_to_map(cls, table, arrow.read_header(schema),
+                                  **kwargs)
+
+    @classmethod
+    def open(cls, path, mmap=True, **kwargs):
+        """Open a genotype-phenotype map saved with `save`.
+
+        Parameters
+        ----------
+        path : str
+            directory of the saved map.
+        mmap : bool (default=True)
+            memory-map the arrays (read-only) instead of reading them, so
+            pages are loaded on demand and shared between processes.
+
+        Columns are read straight from the arrays; the `data` DataFrame is
+        only built when it is accessed. Keyword arguments override the
+        wildtype, mutations, etc. stored in the header.
+        """
+        return store.load(cls, path, mmap=mmap, **kwargs)
+
     @classmethod
     def read_json(cls, filename, **kwargs):
         """Load a genotype-phenotype map directly from a json file.
         The JSON metadata must include the following attributes
 
+        The file is parsed incrementally (see `gpmap.jsonfile`), so the data
+        columns go straight into typed arrays.
+
         Note
         ----
         Keyword arguments override input that is loaded from the JSON file.
         """
-        # Open, json load, and close a json file
-        with open(filename, "r") as f:
-            metadata = json.load(f)
-
-        return cls.from_dict(metadata)
+        return jsonfile.read(cls, filename, **kwargs)
 
 
     @classmethod
@@ -245,10 +500,42 @@ class GenotypePhenotypeMap(object):
     # ----------------------------------------------------------
 
     def to_pickle(self, filename, **kwargs):
-        """Write GenotypePhenotypeMap object to a pickle file.
+        """Write GenotypePhenotypeMap object to a pickle file, with the
+        highest pickle protocol available.
         """
         with open(filename, 'wb') as f:
-            pickle.dump(self, f)
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, path):
+        """Save genotype-phenotype map to a directory of raw NumPy arrays,
+        which can be opened (and memory-mapped) with `open`. See
+        `gpmap.store` for the layout.
+        """
+        store.save(self, path)
+
+    def to_parquet(self, filename, **kwargs):
+        """Write genotype-phenotype map to a Parquet file, with the wildtype,
+        mutations and metadata in the schema (see `gpmap.arrow`).
+
+        Keyword arguments are passed directly to
+        `pyarrow.parquet.write_table`, e.g. `row_group_size` or
+        `compression`.
+        """
+        arrow.import_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(arrow.map_to_table(self), filename, **kwargs)
+
+    def to_feather(self, filename, **kwargs):
+        """Write genotype-phenotype map to a Feather (Arrow IPC) file, with
+        the wildtype, mutations and metadata in the schema (see
+        `gpmap.arrow`).
+
+        Keyword arguments are passed directly to
+        `pyarrow.feather.write_feather`.
+        """
+        arrow.import_pyarrow()
+        import pyarrow.feather as feather
+        feather.write_feather(arrow.map_to_table(self), filename, **kwargs)
 
     def to_excel(self, filename=None, **kwargs):
         """Write genotype-phenotype map to excel spreadsheet.
@@ -294,16 +581,46 @@ class GenotypePhenotypeMap(object):
     def to_json(self, filename=None, complete=False):
         """Write genotype-phenotype map to json file. If no filename is given
         returns
+
+        Columns are streamed to the file one chunk at a time, straight from
+        their arrays. If `complete` is True, the complete data is streamed
+        instead, without being materialized.
         """
-        # Get metadata.
-        data = self.to_dict(complete=complete)
+        if complete:
+            view = self.complete_data
+            columns = [(col, view.iter_column(col)) for col in view.columns]
+        else:
+            columns = [(col, jsonfile.iter_chunks(self.data[col].to_numpy()))
+                       for col in self.data.columns]
 
-        # Write to json file.
+        # Stream columns to the json file.
         if filename is None:
-            return json.dumps(data)
+            f = io.StringIO()
+            jsonfile.write(f, self._json_header(), columns, self.metadata)
+            return f.getvalue()
         else:
             with open(filename, "w") as f:
-                json.dump(data, f)
+                jsonfile.write(f, self._json_header(), columns, self.metadata)
+
+    def _json_header(self):
+        """Metadata written before the data in json files."""
+        return {"wildtype": self.wildtype, "mutations": self.mutations}
+
+    @property
+    def complete_data(self):
+        """Lazy view of the data over the complete genotype space (see
+        `CompleteDataView`). Missing genotypes have NaN values."""
+        if "complete_data" not in self._cache:
+            self._cache["complete_data"] = CompleteDataView(self)
+        return self._cache["complete_data"]
+
+    @property
+    def missing_data(self):
+        """Lazy view of the genotypes missing from the map (see
+        `MissingDataView`)."""
+        if "missing_data" not in self._cache:
+            self._cache["missing_data"] = MissingDataView(self)
+        return self._cache["missing_data"]
 
     @property
     def length(self):
@@ -313,7 +630,7 @@ class GenotypePhenotypeMap(object):
     @property
     def n(self):
         """Get number of genotypes, i.e. size of the genotype-phenotype map."""
-        return len(self.genotypes)
+        return len(self._column("genotypes"))
 
     @property
     def wildtype(self):
@@ -324,7 +641,84 @@ class GenotypePhenotypeMap(object):
     def wildtype(self, wildtype):
         """If a wildtype is given after init, rebuild binary genotypes."""
         self._wildtype = wildtype
-        self.add_binary()
+        self._reset()
+
+    @property
+    def space(self):
+        """The complete genotype space given by the mutations dictionary (see
+        `GenotypeSpace`)."""
+        if "space" not in self._cache:
+            self._cache["space"] = GenotypeSpace(self.wildtype, self.mutations)
+        return self._cache["space"]
+
+    @property
+    def data(self):
+        """The core data object (pandas.DataFrame)."""
+        if self._data is None and self._source is not None:
+            self._data = self._source_to_data()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        """Setting new data clears (and, if not lazy, rebuilds) all derived
+        structures."""
+        self._source = None
+        self._data = data
+        self._reset()
+
+    def _has_source(self, name):
+        """Whether a column is still read from the source arrays."""
+        return (self._data is None and self._source is not None
+                and name in self._source)
+
+    def _column(self, name):
+        """Values of a data column, read from the source arrays if `data`
+        has not been built yet (see `open`)."""
+        if self._has_source(name):
+            return self._source[name]
+        return self.data[name].values
+
+    def _source_to_data(self):
+        """Build the data DataFrame from the source arrays."""
+        source = self._source
+        data = {"genotypes": np.asarray(source["genotypes"]).astype(str)}
+        for name in ["phenotypes", "n_replicates", "stdeviations"]:
+            data[name] = np.asarray(source[name])
+        if self._include_binary:
+            data["binary"] = utils.binary_to_strings(self.binary_matrix)
+        for name in ["n_mutations", "codes"]:
+            if name in source:
+                data[name] = np.asarray(source[name])
+        for name in source:
+            if name not in data and name != "binary_packed":
+                data[name] = np.asarray(source[name])
+        return pd.DataFrame(data)
+
+    @property
+    def encoding_table(self):
+        """Pandas DataFrame showing how mutations map to binary
+        representation."""
+        if "encoding_table" not in self._cache:
+            self._cache["encoding_table"] = utils.get_encoding_table(
+                self.wildtype,
+                self.mutations,
+                self._site_labels
+            )
+        return self._cache["encoding_table"]
+
+    @property
+    def std(self):
+        """Standard deviation error map."""
+        if "std" not in self._cache:
+            self._add_error()
+        return self._cache["std"]
+
+    @property
+    def err(self):
+        """Standard error map."""
+        if "err" not in self._cache:
+            self._add_error()
+        return self._cache["err"]
 
     @property
     def mutant(self):
@@ -350,27 +744,78 @@ class GenotypePhenotypeMap(object):
     @property
     def genotypes(self):
         """Get the genotypes of the system."""
+        if self._has_source("genotypes"):
+            return np.asarray(self._source["genotypes"]).astype(str)
         return self.data.genotypes.values
 
     @property
     def binary(self):
-        """Binary representation of genotypes."""
-        return self.data.binary.values
+        """Binary representation of genotypes. Without a binary column in
+        data, the strings are built from `binary_matrix` on first access and
+        cached."""
+        if not self._has_source("binary_packed"):
+            if "binary" not in self.data and self._include_binary:
+                self.add_binary()
+            if "binary" in self.data:
+                return self.data.binary.values
+        if "binary_strings" not in self._cache:
+            self._cache["binary_strings"] = np.array(
+                utils.binary_to_strings(self.binary_matrix))
+        return self._cache["binary_strings"]
+
+    @property
+    def binary_packed(self):
+        """Binary representation of genotypes packed into bits. Each row
+        holds the bits of one genotype in uint8 words (see `numpy.packbits`).
+        """
+        if "binary_packed" not in self._cache:
+            self.add_binary()
+        return self._cache["binary_packed"]
+
+    @property
+    def binary_matrix(self):
+        """Binary representation of genotypes as a (n, width) matrix of 0s and
+        1s (uint8), unpacked from `binary_packed` on first access.
+        """
+        if "binary_matrix" not in self._cache:
+            matrix = np.unpackbits(self.binary_packed, axis=1)
+            width = self._cache["binary_width"]
+            self._cache["binary_matrix"] = matrix[:, :width]
+        return self._cache["binary_matrix"]
+
+    @property
+    def n_mutations(self):
+        """Number of mutations in each genotype."""
+        if self._has_source("n_mutations"):
+            return self._source["n_mutations"]
+        if "n_mutations" not in self.data:
+            self.add_n_mutations()
+        return self.data.n_mutations.values
+
+    @property
+    def codes(self):
+        """Mixed-radix integer code of each genotype, i.e. its position in the
+        complete genotype space given by the mutations dictionary."""
+        if self._has_source("codes"):
+            return self._source["codes"]
+        if "codes" not in self.data:
+            self.add_codes()
+        return self.data.codes.values
 
     @property
     def phenotypes(self):
         """Get the phenotypes of the system. """
-        return self.data.phenotypes.values
+        return self._column("phenotypes")
 
     @property
     def stdeviations(self):
         """Get stdeviations"""
-        return self.data.stdeviations.values
+        return self._column("stdeviations")
 
     @property
     def n_replicates(self):
         """Return the number of replicate measurements made of the phenotype"""
-        return self.data.n_replicates.values
+        return self._column("n_replicates")
 
     @property
     def index(self):
@@ -379,33 +824,234 @@ class GenotypePhenotypeMap(object):
 
     def _add_error(self):
         """Store error maps"""
-        self.std = errors.StandardDeviationMap(self)
-        self.err = errors.StandardErrorMap(self)
+        self._cache["std"] = errors.StandardDeviationMap(self)
+        self._cache["err"] = errors.StandardErrorMap(self)
 
     def add_binary(self):
         """Build a binary representation of set of genotypes.
 
-        Add as a column to the main DataFrame.
+        The representation is stored packed into bits (`binary_packed`). If
+        `include_binary` is True, it is also added as a column of strings to
+        the main DataFrame.
         """
-        binary = utils.genotypes_to_binary(self.genotypes, self.encoding_table)
+        array = utils.genotypes_to_array(self.genotypes)
+        binary = utils.array_to_binary(array, self.encoding_table)
+        self._cache["binary_width"] = binary.shape[1]
+        self._cache["binary_packed"] = np.packbits(binary, axis=1)
+        self._cache.pop("binary_matrix", None)
+        self._cache.pop("binary_strings", None)
 
         # Add this as a column to the map.
-        self.data['binary'] = binary
+        if self._include_binary:
+            self.data['binary'] = utils.binary_to_strings(binary)
 
     def add_n_mutations(self):
         """Build a column with the number of mutations in each genotype.
 
         Add as a column to the main DataFrame.
         """
-        n_mutations = [binary.count('1') for binary in self.binary]
+        n_mutations = utils.count_bits(self.binary_packed, axis=1)
         self.data['n_mutations'] = n_mutations
 
 
-    def get_missing_genotypes(self):
-        """Get all genotypes missing from the complete genotype-phenotype map."""
-        return utils.get_missing_genotypes(
+    def add_codes(self):
+        """Build a column with the mixed-radix integer code of each genotype
+        and index the map by these codes.
+
+        Add as a column to the main DataFrame.
+        """
+        codes = utils.genotypes_to_codes(
             self.genotypes,
-            mutations=self.mutations
+            self.mutations,
+            wildtype=self.wildtype
+        )
+        self.data['codes'] = codes
+        self._cache["code_index"] = pd.Index(codes)
+
+    def _codes_fit(self):
+        """Whether the genotype space is small enough for 64-bit integer
+        codes. Maps over larger spaces have no `codes` column, and are
+        indexed by their genotype strings instead."""
+        if "codes_fit" not in self._cache:
+            self._cache["codes_fit"] = utils.codes_fit(
+                self.mutations, wildtype=self.wildtype)
+        return self._cache["codes_fit"]
+
+    def index_of(self, genotypes):
+        """Get the position of genotypes in the map.
+
+        Genotypes are encoded as integer codes and looked up in a hash index,
+        so phenotypes for many genotypes can be fetched with a single array
+        operation, e.g. ``gpm.phenotypes[gpm.index_of(genotypes)]``.
+
+        Parameters
+        ----------
+        genotypes : str or array-like
+            genotype or list of genotypes to find.
+
+        Returns
+        -------
+        index : int or numpy.ndarray
+            position of each genotype in `data`.
+        """
+        scalar = isinstance(genotypes, str)
+        if self._codes_fit():
+            codes = utils.genotypes_to_codes(
+                np.atleast_1d(genotypes),
+                self.mutations,
+                wildtype=self.wildtype
+            )
+            index = self._index_of_codes(codes)
+        else:
+            # Space too large for integer codes: hash the strings.
+            if "genotype_index" not in self._cache:
+                self._cache["genotype_index"] = pd.Index(self.genotypes)
+            index = self._cache["genotype_index"].get_indexer(
+                np.atleast_1d(genotypes))
+
+        # Check that all genotypes are in the map.
+        if np.any(index < 0):
+            missing = np.atleast_1d(genotypes)[index < 0]
+            raise KeyError("Genotypes not found in the map: {}".format(
+                list(missing[:10])))
+
+        if scalar:
+            return int(index[0])
+        return index
+
+    def _index_of_codes(self, codes):
+        """Get the position of integer codes in the map; -1 if missing."""
+        if "code_index" not in self._cache:
+            if self._has_source("codes"):
+                self._cache["code_index"] = pd.Index(self._source["codes"])
+            else:
+                self.add_codes()
+        return self._cache["code_index"].get_indexer(codes)
+
+    def genotype_at(self, codes):
+        """Get the genotypes for a set of mixed-radix integer codes. The
+        genotypes do not need to be in the map.
+
+        Parameters
+        ----------
+        codes : int or array-like
+            integer codes (see `codes`).
+
+        Returns
+        -------
+        genotypes : str or numpy.ndarray
+            genotype for each code.
+        """
+        genotypes = utils.codes_to_genotypes(
+            np.atleast_1d(codes),
+            self.mutations,
+            wildtype=self.wildtype
+        )
+        if np.ndim(codes) == 0:
+            return str(genotypes[0])
+        return genotypes
+
+    def neighbors(self, labels=False):
+        """Get the sparse adjacency matrix of genotypes in the map that differ
+        by a single mutation (see `utils.get_neighbors`). The matrix is
+        cached on the map.
+
+        Parameters
+        ----------
+        labels : bool (default=False)
+            If True, label each edge with the `mutation_index` (see
+            `encoding_table`) of the mutation that connects the genotypes.
+
+        Returns
+        -------
+        neighbors : scipy.sparse.csr_matrix
+            (n, n) adjacency matrix, rows and columns in the order of `data`.
+        """
+        key = ("neighbors", labels)
+        if key not in self._cache:
+            if labels:
+                encoding_table = self.encoding_table
+            else:
+                encoding_table = None
+            self._cache[key] = utils.get_neighbors(
+                self.codes,
+                self.mutations,
+                wildtype=self.wildtype,
+                encoding_table=encoding_table
+            )
+        return self._cache[key]
+
+    def subset(self, index):
+        """Build a new GenotypePhenotypeMap from a subset of the genotypes.
+
+        The new map shares the encoding table and genotype space of this map.
+        Its derived columns (binary, n_mutations, codes) and packed binary
+        representation are sliced from this map instead of re-encoded. The
+        new map is always a plain GenotypePhenotypeMap, even for subclasses
+        such as simulations, whose per-genotype state would not match it.
+
+        Parameters
+        ----------
+        index : array-like
+            positions of the genotypes to keep, or a boolean mask.
+
+        Returns
+        -------
+        gpm : GenotypePhenotypeMap
+            map of the selected genotypes, in the order given.
+        """
+        index = np.asarray(index)
+        if index.dtype == bool:
+            if len(index) != self.n:
+                raise IndexError("Boolean mask must have the same length as "
+                                 "the map.")
+            index = np.flatnonzero(index)
+        else:
+            index = index.astype(np.int64)
+
+        cache = {}
+        for key in ("encoding_table", "space", "binary_width"):
+            if key in self._cache:
+                cache[key] = self._cache[key]
+        if "binary_packed" in self._cache:
+            cache["binary_packed"] = self._cache["binary_packed"][index]
+
+        return GenotypePhenotypeMap._from_data(
+            self.wildtype,
+            self.data.take(index).reset_index(drop=True),
+            self.mutations,
+            site_labels=self._site_labels,
+            include_binary=self._include_binary,
+            lazy=self._lazy,
+            metadata=dict(self.metadata),
+            cache=cache)
+
+    def take(self, mask):
+        """Build a new GenotypePhenotypeMap from the genotypes selected by a
+        boolean mask (or positions). See `subset`."""
+        return self.subset(mask)
+
+    def get_missing_genotypes(self, return_codes=False, lazy=False,
+                              chunksize=utils.MISSING_CHUNKSIZE):
+        """Get all genotypes missing from the complete genotype-phenotype map.
+
+        Parameters
+        ----------
+        return_codes : bool (default=False)
+            Return integer codes instead of genotypes.
+        lazy : bool (default=False)
+            Return an iterator that decodes the missing genotypes chunk by
+            chunk.
+        chunksize : int
+            number of codes scanned at a time.
+        """
+        return utils.missing_genotypes_from_codes(
+            self.codes,
+            self.mutations,
+            wildtype=self.wildtype,
+            return_codes=return_codes,
+            lazy=lazy,
+            chunksize=chunksize
         )
 
     def get_all_possible_genotypes(self):
@@ -413,4 +1059,4 @@ class GenotypePhenotypeMap(object):
         to the genotypes. Consider sorting.
         """
         # Get all genotypes.
-        return utils.mutations_to_genotypes(self.mutations, wildtype=self.wildtype)
+        return self.space[:].tolist()
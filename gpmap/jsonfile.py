@@ -0,0 +1,266 @@
+__doc__ = """Stream genotype-phenotype maps to and from json files.
+
+The layout is the one of `GenotypePhenotypeMap.to_dict`: "wildtype" and
+"mutations", then a "data" object with one array per column, then any
+metadata. Columns are written a chunk at a time straight from their numpy
+arrays, and read back a block of the file at a time into typed arrays, so
+no full list of Python objects is built either way.
+"""
+
+import json
+
+import numpy as np
+
+
+def write(f, header, columns, metadata):
+    """Write a genotype-phenotype map to an open json file, writing each data
+    column one chunk at a time. The output matches `json.dump` of the
+    equivalent dictionary.
+
+    Parameters
+    ----------
+    f : file
+        open file to write to.
+    header : dict
+        items written before "data".
+    columns : list
+        list of (name, chunks) pairs; chunks is an iterable of arrays.
+    metadata : dict
+        items written after "data".
+    """
+    f.write("{")
+    for key, value in header.items():
+        f.write("{}: {}, ".format(json.dumps(key), json.dumps(value)))
+
+    f.write('"data": {')
+    for i, (name, chunks) in enumerate(columns):
+        if i > 0:
+            f.write(", ")
+        f.write("{}: [".format(json.dumps(name)))
+        first = True
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            if not first:
+                f.write(", ")
+            f.write(json.dumps(np.asarray(chunk).tolist())[1:-1])
+            first = False
+        f.write("]")
+    f.write("}")
+
+    for key, value in metadata.items():
+        f.write(", {}: {}".format(json.dumps(key), json.dumps(value)))
+    f.write("}")
+
+
+def iter_chunks(values, chunksize=2**16):
+    """Iterate over slices of a column (numpy array) of at most `chunksize`
+    values."""
+    for start in range(0, len(values), chunksize):
+        yield values[start:start + chunksize]
+
+
+class JsonReader(object):
+    """Incremental reader for json files written by
+    `write`.
+
+    The file is read one block at a time. Small values (wildtype, mutations,
+    metadata) are decoded with `json.JSONDecoder.raw_decode`; the arrays in
+    "data" are decoded a block of elements at a time and copied into typed
+    numpy arrays, so no full list of Python objects is ever built.
+    """
+
+    blocksize = 2**20
+
+    def __init__(self, f, blocksize=None):
+        self.f = f
+        self.blocksize = blocksize or self.blocksize
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self):
+        """Read the next block of the file. Returns False at the end of the
+        file."""
+        block = self.f.read(self.blocksize)
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return len(block) > 0
+
+    def _peek(self):
+        """Next non-whitespace character ('' at the end of the file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def _expect(self, chars):
+        """Consume the next character, which must be one of `chars`."""
+        char = self._peek()
+        if char == "" or char not in chars:
+            raise Exception("Invalid json file: expected one of {} at '{}'."
+                            .format(list(chars), self.buf[self.pos:][:20]))
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next json value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the end of the block may be cut short.
+                if end < len(self.buf) or not self._fill():
+                    self.pos = end
+                    return value
+            except ValueError:
+                if not self._fill():
+                    raise
+
+    def _decode(self, stop):
+        """Decode the elements of an array up to position `stop` of the
+        buffer. Returns None if the text is not a list of whole elements,
+        e.g. if `stop` falls inside a string."""
+        try:
+            return json.loads("[" + self.buf[self.pos:stop] + "]")
+        except ValueError:
+            return None
+
+    def iter_array(self):
+        """Iterate over the next json array in lists of elements."""
+        self._expect("[")
+        while True:
+            end = self.buf.find("]", self.pos)
+            if end != -1:
+                values = self._decode(end)
+                if values is not None:
+                    self.pos = end + 1
+                    yield values
+                    return
+            stop = self.buf.rfind(",", self.pos,
+                                  end if end != -1 else len(self.buf))
+            if stop != -1:
+                values = self._decode(stop)
+                if values is not None:
+                    self.pos = stop + 1
+                    yield values
+                    continue
+            if end == -1 and stop == -1:
+                # No complete element in the buffer yet.
+                if not self._fill():
+                    raise Exception("Invalid json file: unterminated array.")
+                continue
+            # Elements with commas or brackets inside them: decode one.
+            yield [self._value()]
+            if self._expect(",]") == "]":
+                return
+
+    def iter_object(self):
+        """Iterate over the keys of the next json object. The caller must
+        consume the value of each key before asking for the next."""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key
+            if self._expect(",}") == "}":
+                return
+
+    def read_map(self, columns):
+        """Read a json map, keeping the given data columns as numpy arrays.
+
+        Parameters
+        ----------
+        columns : dict
+            dtype of each data column to keep (None to infer it).
+
+        Returns
+        -------
+        metadata : dict
+            every item besides "data".
+        data : dict
+            numpy array of each column kept.
+        """
+        metadata, data = {}, {}
+        n = None
+        for key in self.iter_object():
+            if key != "data":
+                metadata[key] = self._value()
+                continue
+            for name in self.iter_object():
+                if name not in columns:
+                    for _ in self.iter_array():
+                        pass
+                    continue
+                data[name] = read_array(self.iter_array(),
+                                              columns[name], size=n)
+                if data[name] is not None:
+                    n = len(data[name])
+        return metadata, data
+
+
+def read_array(chunks, dtype=None, size=None):
+    """Copy lists of values into a typed numpy array.
+
+    The array is preallocated with `size` elements if it is known (e.g. from
+    a previous column), and doubled when full otherwise. A column of nulls
+    only is returned as None.
+    """
+    array = None
+    n = 0
+    nulls = 0
+    for chunk in chunks:
+        if dtype is not None and dtype.kind == "f":
+            nulls += chunk.count(None)
+        values = np.asarray(chunk, dtype=dtype)
+        if array is None:
+            array = np.empty(max(size or 0, len(values)), dtype=values.dtype)
+        if values.dtype != array.dtype:
+            array = array.astype(np.result_type(array, values))
+        if n + len(values) > len(array):
+            array = np.resize(array, max(2 * len(array), n + len(values)))
+        array[n:n + len(values)] = values
+        n += len(values)
+
+    if array is None:
+        return np.empty(0, dtype=dtype)
+    if nulls == n and n > 0:
+        return None
+    if len(array) > n:
+        array = array[:n].copy()
+    return array
+
+
+def read(cls, filename, **kwargs):
+    """Read a map from a json file written by `write`, incrementally (see
+    `JsonReader`). Keyword arguments override the values in the file."""
+    columns = dict(
+        genotypes=None,
+        phenotypes=np.dtype(float),
+        stdeviations=np.dtype(float),
+        n_replicates=np.dtype(np.int64),
+    )
+    # Read the file incrementally into typed arrays.
+    with open(filename, "r") as f:
+        metadata, data = JsonReader(f).read_map(columns)
+
+    # Check keys in dictionary.
+    if not all(key in data for key in columns):
+        raise Exception('The "data" field must have the following keys: '
+                        '"genotypes", "phenotypes", "stdeviations", '
+                        '"n_replicates"')
+
+    metadata.update(kwargs)
+    wildtype = metadata.pop("wildtype")
+    return cls(
+        wildtype,
+        data["genotypes"].astype(str),
+        data["phenotypes"],
+        stdeviations=data["stdeviations"],
+        n_replicates=data["n_replicates"],
+        **metadata
+    )
@@ -0,0 +1,164 @@
+__doc__ = """Sample noisy replicate measurements of a genotype-phenotype map.
+
+Each genotype `i` is measured `n_replicates[i]` times, with normal noise of
+width `stdeviations[i]` around its phenotype. Measurements are drawn in
+chunks of at most `chunksize` values from a single numpy Generator, so
+results only depend on the seed (not on the chunk size), and memory stays
+bounded however many replicates are drawn.
+"""
+
+import numpy as np
+
+
+# Default number of measurements drawn at a time.
+CHUNKSIZE = 2**20
+
+
+def _replicate_counts(gpm, n_replicates):
+    """Number of replicates of each genotype as an int array."""
+    if n_replicates is None:
+        n_replicates = gpm.n_replicates
+    counts = np.broadcast_to(np.asarray(n_replicates, dtype=np.int64),
+                             (gpm.n,))
+    if np.any(counts < 0):
+        raise Exception("Number of replicates must be non-negative.")
+    return counts
+
+
+def _noise_widths(gpm, stdeviations):
+    """Standard deviation of the noise of each genotype as a float array."""
+    if stdeviations is None:
+        stdeviations = gpm.stdeviations
+    widths = np.broadcast_to(np.asarray(stdeviations, dtype=float),
+                             (gpm.n,))
+    if np.any(np.isnan(widths)):
+        raise Exception("The map has no standard deviations. Set them, or "
+                        "pass stdeviations.")
+    return widths
+
+
+def iter_replicates(gpm, n_replicates=None, stdeviations=None, seed=None,
+                    chunksize=CHUNKSIZE):
+    """Iterate over replicate measurements of every genotype in chunks.
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map with phenotypes (and, optionally, stdeviations and n_replicates).
+    n_replicates : int or array-like (optional)
+        number of measurements per genotype. Defaults to the map's
+        n_replicates.
+    stdeviations : float or array-like (optional)
+        width of the noise per genotype. Defaults to the map's stdeviations.
+    seed : None, int or numpy.random.Generator
+        seed for the random number generator.
+    chunksize : int
+        maximum number of measurements per chunk.
+
+    Yields
+    ------
+    index : numpy.ndarray
+        row of the genotype of each measurement (sorted).
+    values : numpy.ndarray
+        measured values.
+    """
+    rng = np.random.default_rng(seed)
+    counts = _replicate_counts(gpm, n_replicates)
+    widths = _noise_widths(gpm, stdeviations)
+    phenotypes = np.asarray(gpm.phenotypes, dtype=float)
+
+    offsets = np.cumsum(counts)
+    total = int(offsets[-1]) if len(offsets) > 0 else 0
+    for start in range(0, total, chunksize):
+        stop = min(start + chunksize, total)
+        index = np.searchsorted(offsets, np.arange(start, stop),
+                                side="right")
+        values = rng.standard_normal(stop - start)
+        values *= widths[index]
+        values += phenotypes[index]
+        yield index, values
+
+
+def sample_replicates(gpm, n_replicates=None, stdeviations=None, seed=None,
+                      chunksize=CHUNKSIZE):
+    """Draw replicate measurements of every genotype, in long format (see
+    `iter_replicates` for the parameters).
+
+    Returns
+    -------
+    index : numpy.ndarray
+        row of the genotype of each measurement.
+    values : numpy.ndarray
+        measured values.
+    """
+    chunks = list(iter_replicates(gpm, n_replicates=n_replicates,
+                                  stdeviations=stdeviations, seed=seed,
+                                  chunksize=chunksize))
+    index = np.concatenate([c[0] for c in chunks]
+                           + [np.empty(0, dtype=np.int64)])
+    values = np.concatenate([c[1] for c in chunks] + [np.empty(0)])
+    return index, values
+
+
+def sample_map(gpm, n_replicates=None, stdeviations=None, seed=None,
+               chunksize=CHUNKSIZE, ddof=1):
+    """Draw replicate measurements of every genotype and build a new map
+    from their means and standard deviations (see `iter_replicates` for the
+    parameters).
+
+    Measurements are aggregated chunk by chunk (merging means and sums of
+    squares with Chan et al.'s parallel update), so no more than `chunksize`
+    of them are held at a time.
+
+    Parameters
+    ----------
+    ddof : int (default=1)
+        delta degrees of freedom of the standard deviations.
+
+    Returns
+    -------
+    gpm : GenotypePhenotypeMap
+        plain copy of the map, even for simulations (see
+        `GenotypePhenotypeMap.subset`, nothing is encoded again), with the
+        mean of the measurements as phenotypes, their standard deviation as
+        stdeviations and their number as n_replicates.
+        Genotypes without enough measurements get NaN.
+    """
+    counts = np.zeros(gpm.n, dtype=np.int64)
+    means = np.zeros(gpm.n, dtype=float)
+    m2 = np.zeros(gpm.n, dtype=float)
+
+    for index, values in iter_replicates(gpm, n_replicates=n_replicates,
+                                         stdeviations=stdeviations,
+                                         seed=seed, chunksize=chunksize):
+        # Chunks cover a contiguous range of genotypes.
+        first, last = index[0], index[-1] + 1
+        local = index - first
+        n_b = np.bincount(local, minlength=last - first)
+        present = n_b > 0
+        mean_b = np.bincount(local, weights=values, minlength=last - first)
+        mean_b[present] /= n_b[present]
+        m2_b = np.bincount(local, weights=(values - mean_b[local])**2,
+                           minlength=last - first)
+
+        # Merge with the running statistics of the same genotypes.
+        n_a = counts[first:last]
+        n = n_a + n_b
+        delta = mean_b - means[first:last]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(present, n_b / n, 0.0)
+        means[first:last] += delta * weight
+        m2[first:last] += m2_b + delta**2 * n_a * weight
+        counts[first:last] = n
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means[counts == 0] = np.nan
+        stdeviations = np.sqrt(m2 / (counts - ddof))
+    stdeviations[counts <= ddof] = np.nan
+
+    # Plain copy of the map (same encoding), with the new measurements.
+    sampled = gpm.subset(np.arange(gpm.n))
+    sampled.data["phenotypes"] = means
+    sampled.data["stdeviations"] = stdeviations
+    sampled.data["n_replicates"] = counts
+    return sampled
@@ -3,3 +3,8 @@ from .nk import NKSimulation
 from .hoc import HouseOfCardsSimulation
 from .fuji import MountFujiSimulation
 from .multipeak_fuji import MultiPeakMountFujiSimulation
+from .walsh import WalshHadamardSimulation
+from .fisher import FisherGeometricSimulation
+from .stream import (StreamingRandomSimulation, StreamingNKSimulation,
+                     StreamingMountFujiSimulation)
+from .ensemble import ensemble
@@ -1,10 +1,9 @@
-import random
 import numpy as np
 from gpmap import utils
 from gpmap.gpm import GenotypePhenotypeMap
 
 
-def random_mutation_set(length, alphabet_size=2, type='AA'):
+def random_mutation_set(length, alphabet_size=2, type='AA', rng=None):
     """Generate a random mutations dictionary for simulations.
 
     Parameters
@@ -16,7 +15,10 @@ def random_mutation_set(length, alphabet_size=2, type='AA'):
         size alphab_size[i].
     type : 'AA' or "DNA'
         Use amino acid alphabet or DNA alphabet
+    rng : None, int, numpy.random.SeedSequence or numpy.random.Generator
+        seed or random number generator for the letters (see `get_rng`).
     """
+    rng = get_rng(rng)
 
     if isinstance(alphabet_size, int):
         size = [alphabet_size for i in range(length)]
@@ -29,17 +31,35 @@ def random_mutation_set(length, alphabet_size=2, type='AA'):
             A = utils.AMINO_ACIDS
         elif type == 'DNA':
             A = utils.DNA
-        random.shuffle(A)
-        alphabet = A[:size[i]]
+        alphabet = [A[j] for j in rng.permutation(len(A))[:size[i]]]
         mutations[i] = alphabet
     return mutations
 
 
+def get_rng(seed=None):
+    """Get a random number generator for simulations.
+
+    Parameters
+    ----------
+    seed : None, int, numpy.random.SeedSequence or numpy.random.Generator
+        A Generator or RandomState is returned as is. Anything else seeds a
+        new `numpy.random.Generator` (see `numpy.random.default_rng`); None
+        seeds it from fresh entropy, so pass a seed for reproducible maps.
+    """
+    if isinstance(seed, (np.random.Generator, np.random.RandomState)):
+        return seed
+    return np.random.default_rng(seed)
+
+
 class BaseSimulation(GenotypePhenotypeMap):
     """ Build a simulated GenotypePhenotypeMap. Generates random phenotypes.
+
+    All random draws of a simulation go through its `rng` attribute, which
+    is set from the `seed` keyword argument (see `get_rng`).
     """
 
-    def __init__(self, wildtype, mutations, *args, **kwargs):
+    def __init__(self, wildtype, mutations, *args, seed=None, **kwargs):
+        self.rng = get_rng(seed)
         # build genotypes
         genotypes = utils.mutations_to_genotypes(mutations, wildtype=wildtype)
         phenotypes = np.empty(len(genotypes), dtype=float)
@@ -65,7 +85,11 @@ class BaseSimulation(GenotypePhenotypeMap):
         -------
         self : GenotypePhenotypeSimulation
         """
-        mutations = random_mutation_set(length, alphabet_size=alphabet_size)
+        # Letters are drawn from the simulation's seed, so seeded maps have
+        # the same genotypes.
+        rng = get_rng(kwargs.get("seed"))
+        mutations = random_mutation_set(length, alphabet_size=alphabet_size,
+                                        rng=rng)
         wildtype = "".join([m[0] for m in mutations.values()])
         self = cls(wildtype, mutations, *args, **kwargs)
         return self
@@ -85,5 +109,19 @@ class BaseSimulation(GenotypePhenotypeMap):
         self.data.stdeviations = stdeviations
         return self
 
+    def randomize(self, seed=None):
+        """Redraw the random parameters of the simulation and rebuild its
+        phenotypes.
+
+        Parameters
+        ----------
+        seed : None, int, numpy.random.SeedSequence or numpy.random.Generator
+            new seed for `rng`. If None, keep drawing from the current `rng`.
+        """
+        if seed is not None:
+            self.rng = get_rng(seed)
+        self.build()
+        return self
+
     def build(self):
         raise Exception("must be implemented in subclass.")
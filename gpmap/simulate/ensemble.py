@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Simulation held by each worker process (see `_init_worker`).
+_TEMPLATE = None
+
+
+def _init_worker(template):
+    """Keep a copy of the template simulation in the worker process."""
+    global _TEMPLATE
+    _TEMPLATE = template
+
+
+def _run_replicates(seeds):
+    """Randomize the worker's template once per seed and stack the
+    phenotypes."""
+    phenotypes = np.empty((len(seeds), _TEMPLATE.n), dtype=float)
+    for i, seed in enumerate(seeds):
+        _TEMPLATE.randomize(seed=seed)
+        phenotypes[i] = _TEMPLATE.phenotypes
+    return phenotypes
+
+
+def ensemble(cls, n_replicates, n_jobs=1, seed=None, return_map=False,
+             **params):
+    """Simulate many replicate landscapes of the same genotype space.
+
+    The simulation is built once (genotypes, encoding, ...) and then
+    redrawn for every replicate with `randomize`. Replicate `i` draws from
+    its own stream, the `i`-th child of `numpy.random.SeedSequence(seed)`,
+    so results do not depend on `n_jobs`.
+
+    Parameters
+    ----------
+    cls : BaseSimulation subclass
+        simulation to run, e.g. `NKSimulation`.
+    n_replicates : int
+        number of replicate landscapes.
+    n_jobs : int (default=1)
+        number of worker processes. If None or -1, use all CPUs.
+    seed : None, int or numpy.random.SeedSequence
+        root seed of the ensemble.
+    return_map : bool (default=False)
+        also return the template simulation, which gives the genotypes
+        (columns) of the ensemble.
+    **params :
+        arguments passed to `cls`. If `length` is given instead of
+        `wildtype` and `mutations`, the simulation is built with
+        `cls.from_length`.
+
+    Returns
+    -------
+    phenotypes : numpy.ndarray
+        (n_replicates, n_genotypes) array of phenotypes.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        root = seed
+    else:
+        root = np.random.SeedSequence(seed)
+    seeds = root.spawn(n_replicates)
+
+    if "length" in params:
+        template = cls.from_length(seed=root, **params)
+    else:
+        template = cls(seed=root, **params)
+
+    if n_jobs is None or n_jobs < 0:
+        n_jobs = os.cpu_count()
+
+    if n_jobs == 1 or n_replicates <= 1:
+        _init_worker(template)
+        try:
+            phenotypes = _run_replicates(seeds)
+        finally:
+            _init_worker(None)
+    else:
+        # A few batches per worker to balance the load.
+        n_batches = min(n_replicates, 4 * n_jobs)
+        bounds = np.linspace(0, n_replicates, n_batches + 1).astype(int)
+        batches = [seeds[i:j] for i, j in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_init_worker,
+                                 initargs=(template,)) as executor:
+            results = list(executor.map(_run_replicates, batches))
+        phenotypes = np.concatenate(results, axis=0)
+
+    if return_map:
+        return phenotypes, template
+    return phenotypes
@@ -0,0 +1,111 @@
+import numpy as np
+
+from .base import get_rng, BaseSimulation
+
+
+class FisherGeometricSimulation(BaseSimulation):
+    """Construct a genotype-phenotype map from Fisher's geometric model. [1]_
+
+    Every mutation (column of the binary representation) moves a genotype by
+    a random vector in an n-dimensional trait space. The position of a
+    genotype is the wildtype's position plus the sum of the vectors of its
+    mutations, and its fitness falls off as a Gaussian of the distance to an
+    optimum at the origin:
+
+    .. math::
+
+        f(g) = \\exp \\left( - \\frac{\\lVert z_0 + B(g) E \\rVert^2}
+        {2 \\sigma^2} \\right)
+
+    where $z_0$ is the wildtype position, $B(g)$ the binary representation
+    of $g$, $E$ the matrix of mutation effects and $\\sigma$ the fitness
+    width. Positions of all genotypes come from one matrix product.
+
+    Parameters
+    ----------
+    wildtype : str
+        reference genotype.
+
+    mutations : dict
+        mutations alphabet for each site.
+
+    n_traits : int
+        number of dimensions of the trait space.
+
+    effect_width : float
+        standard deviation of the (normal) mutation effects in each trait.
+
+    wildtype_distance : float
+        distance of the wildtype from the optimum, along the first trait.
+
+    fitness_width : float
+        width ($\\sigma$) of the Gaussian fitness function.
+
+    Attributes
+    ----------
+    effects : numpy.ndarray
+        (n_mutations, n_traits) effect of each mutation.
+
+    References
+    ----------
+
+    _ [1] Tenaillon, Olivier. "The utility of Fisher's geometric model in
+        evolutionary genetics." Annual Review of Ecology, Evolution, and
+        Systematics 45 (2014): 179-201.
+    """
+
+    def __init__(self, wildtype, mutations, n_traits=2, effect_width=0.1,
+                 wildtype_distance=1.0, fitness_width=1.0, *args, **kwargs):
+        super(FisherGeometricSimulation, self).__init__(wildtype, mutations,
+                                                        *args, **kwargs)
+        self.n_traits = n_traits
+        self.fitness_width = fitness_width
+        self.wildtype_position = np.zeros(n_traits, dtype=float)
+        self.wildtype_position[0] = wildtype_distance
+        self.set_random_effects(effect_width=effect_width)
+
+    @property
+    def effects(self):
+        """Effect of each mutation in trait space."""
+        return self._effects
+
+    @property
+    def positions(self):
+        """Position of each genotype in trait space."""
+        # One (genotypes x mutations) @ (mutations x traits) product.
+        positions = self.binary_matrix.astype(float) @ self.effects
+        positions += self.wildtype_position
+        return positions
+
+    def set_random_effects(self, effect_width=0.1):
+        """Draw the effect of each mutation from a normal distribution."""
+        self.effect_width = effect_width
+        n_mutations = self.binary_matrix.shape[1]
+        self._effects = self.rng.normal(scale=effect_width,
+                                        size=(n_mutations, self.n_traits))
+        self.build()
+
+    def set_effects(self, effects):
+        """Set the effect of each mutation from a
+        (n_mutations, n_traits) array."""
+        effects = np.asarray(effects, dtype=float)
+        shape = (self.binary_matrix.shape[1], self.n_traits)
+        if effects.shape != shape:
+            raise Exception("Effects must be an array with shape %s."
+                            % (shape,))
+        self._effects = effects
+        self.build()
+
+    def randomize(self, seed=None):
+        """Redraw the mutation effects and rebuild phenotypes."""
+        if seed is not None:
+            self.rng = get_rng(seed)
+        self.set_random_effects(effect_width=self.effect_width)
+        return self
+
+    def build(self):
+        """Build phenotypes with a Gaussian fitness function."""
+        positions = self.positions
+        distance2 = np.einsum("ij,ij->i", positions, positions)
+        self.data.phenotypes = np.exp(-distance2
+                                      / (2 * self.fitness_width**2))
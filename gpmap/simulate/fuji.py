@@ -1,6 +1,6 @@
 import numpy as np
 from gpmap.gpm import GenotypePhenotypeMap
-from gpmap import utils
+from gpmap import utils, distance
 from .base import random_mutation_set, BaseSimulation
 
 
@@ -124,10 +124,7 @@ class MountFujiSimulation(BaseSimulation):
             return self._hamming
         # calculate the hamming distance if not done already
         except AttributeError:
-            hd = np.empty(self.n, dtype=int)
-            for i, g in enumerate(self.genotypes):
-                hd[i] = utils.hamming_distance(self.wildtype, g)
-            self._hamming = hd
+            self._hamming = distance.hamming(self.wildtype, self.genotypes)
             return self._hamming
 
     @property
@@ -141,7 +138,7 @@ class MountFujiSimulation(BaseSimulation):
 
         elif self.roughness_dist == 'normal':
             # Set roughness.
-            self._roughness = np.random.normal(
+            self._roughness = self.rng.normal(
                 scale=self.roughness_width,
                 size=self.n)
 
@@ -149,7 +146,7 @@ class MountFujiSimulation(BaseSimulation):
 
         elif self.roughness_dist == 'uniform':
             # Set roughness.
-            self._roughness = np.random.uniform(
+            self._roughness = self.rng.uniform(
                 high=self.roughness_width,
                 low=-self.roughness_width,
                 size=self.n)
@@ -207,6 +204,11 @@ class MountFujiSimulation(BaseSimulation):
         """Mt. Fuji phenotypes without noise."""
         return self.field_strength * self.hamming
 
+    def randomize(self, seed=None):
+        """Redraw the roughness and rebuild phenotypes."""
+        self._roughness = None
+        return super(MountFujiSimulation, self).randomize(seed=seed)
+
     def build(self):
         """Construct phenotypes using a rough Mount Fuji model."""
         self.data.phenotypes = self.roughness + self.scale
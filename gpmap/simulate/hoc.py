@@ -1,15 +1,67 @@
+import numpy as np
+
+from gpmap import utils
 from .nk import NKSimulation
 from .base import random_mutation_set
 
 
 class HouseOfCardsSimulation(NKSimulation):
     """Construct a 'House of Cards' fitness landscape.
+
+    Every genotype gets an independent random phenotype. This is an NK
+    landscape whose window spans the whole genotype, but instead of building
+    the NK table from binary keys, one value is drawn per genotype in the
+    space and looked up by integer code (see `codes`). The NK `keys` are only
+    built if they are accessed.
     """
 
     def __init__(self, wildtype, mutations, k_range=(0, 1), *args, **kwargs):
         super(NKSimulation, self).__init__(wildtype, mutations, *args,
                                            **kwargs)
         # Set parameters
-        self.set_order(len(self.binary[0]))
+        self.K = self.binary_matrix.shape[1]
+        self.order = self.K
+        self._keys = None
         self.set_random_values(k_range=k_range)
+
+    @property
+    def keys(self):
+        """NK table keys: the binary representation of every genotype in the
+        space, ordered by integer code.
+        """
+        if self._keys is None:
+            codes = np.arange(self.space.size, dtype=np.int64)
+            array = utils.codes_to_array(codes, self.mutations,
+                                         wildtype=self.wildtype)
+            binary = utils.array_to_binary(array, self.encoding_table)
+            self._keys = np.array(utils.binary_to_strings(binary))
+        return self._keys
+
+    def set_order(self, K):
+        """The order of a House of Cards landscape is the genotype length."""
+        raise Exception("The order of a House of Cards landscape is fixed.")
+
+    def set_random_values(self, k_range=(0, 1)):
+        """Set a value for every genotype by drawing from a uniform
+        distribution between the given k_range.
+        """
+        self.k_range = k_range
+        self._values = self.rng.uniform(k_range[0], k_range[1],
+                                        size=self.space.size)
+        self.build()
+
+    def set_table_values(self, values):
+        """Set the value of every genotype from a list/array of values,
+        ordered by integer code.
+        """
+        if len(values) != self.space.size:
+            raise Exception("Length of the values do not equal the number of "
+                            "genotypes in the space. "
+                            "Number of genotypes is : %d" % (self.space.size,))
+        self._values = values
         self.build()
+
+    def build(self):
+        """Build phenotypes by looking up each genotype's value by code."""
+        values = np.asarray(self.values, dtype=float)
+        self.data.phenotypes = values[self.codes]
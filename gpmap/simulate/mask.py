@@ -1,12 +1,51 @@
 import numpy as np
-import pandas as pd
-from .. import GenotypePhenotypeMap
+from .base import get_rng
 
 
-def mask(gpm, mask_fraction):
+def _n_to_choose(gpm, mask_fraction):
+    """Number of genotypes kept by a mask, and the true mask fraction."""
+    if mask_fraction > 1 or mask_fraction < 0:
+        raise Exception("mask_fraction must between between 0 and 1.")
+
+    # Calculate the number of genotypes to select
+    number_to_choose = int((1 - mask_fraction) * gpm.n)
+
+    # Calculate the true fraction (since this is a discrete space.)
+    true_mask_fraction = 1 - float(number_to_choose) / gpm.n
+    return number_to_choose, true_mask_fraction
+
+
+def _iter_masks(gpm, number_to_choose, true_mask_fraction, batch_size, rng):
+    """Draw `batch_size` subsets at once and yield them as maps."""
+    # Keep the genotypes with the smallest random keys in each row.
+    keys = rng.uniform(size=(batch_size, gpm.n))
+    if 0 < number_to_choose < gpm.n:
+        index = np.argpartition(keys, number_to_choose - 1, axis=1)
+    else:
+        index = np.argsort(keys, axis=1)
+    index = np.sort(index[:, :number_to_choose], axis=1)
+    for row in index:
+        yield true_mask_fraction, gpm.subset(row)
+
+
+def mask(gpm, mask_fraction, batch_size=None, seed=None):
     """Create a new GenotypePhenotypeMap object from a random subset of another
     GenotypePhenotypeMap.
 
+    The subset shares the encoding of `gpm` (see
+    `GenotypePhenotypeMap.subset`), so nothing is encoded again.
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map to mask.
+    mask_fraction : float
+        fraction of genotypes to remove.
+    batch_size : int (optional)
+        if given, draw this many masks at once and return a generator of
+        (true_mask_fraction, GenotypePhenotypeMap) pairs.
+    seed : None, int or numpy.random.Generator
+        seed for the random number generator (see `simulate.base.get_rng`).
 
     Returns
     -------
@@ -16,32 +55,15 @@ def mask(gpm, mask_fraction):
     GenotypePhenotypeMap :
         the new genotype-phenotype map.
     """
-    if mask_fraction > 1 or mask_fraction < 0:
-        raise Exception("mask_fraction must between between 0 and 1.")
+    number_to_choose, true_mask_fraction = _n_to_choose(gpm, mask_fraction)
+    rng = get_rng(seed)
 
-    # Calculate the number of genotypes to select
-    number_to_choose = int((1 - mask_fraction) * gpm.n)
-
-    # Calculate the true fraction (since this is a discrete space.)
-    true_mask_fraction = 1 - float(number_to_choose) / gpm.n
+    if batch_size is not None:
+        return _iter_masks(gpm, number_to_choose, true_mask_fraction,
+                           batch_size, rng)
 
     # Randomly choose genotypes
-    index = np.random.choice(gpm.index, number_to_choose, replace=False)
-
-    # Check n_replicates datatype
-    if type(gpm.n_replicates) == int:
-        n_replicates = gpm.n_replicates
-    elif type(gpm.n_replicates) == pd.Series or
-    type(gpm.n_replicates) == np.ndarray:
-        n_replicates = gpm.n_replicates[index].reset_index(drop=True)
-    else:
-        raise Exception("n_replicates are not a valid dtype.")
+    index = rng.choice(gpm.n, number_to_choose, replace=False)
 
     # return Subset genotype
-    return true_mask_fraction, GenotypePhenotypeMap(
-        gpm.wildtype,
-        gpm.genotypes[index].reset_index(drop=True),
-        gpm.phenotypes[index].reset_index(drop=True),
-        mutations=gpm.mutations,
-        stdeviations=gpm.stdeviations[index].reset_index(drop=True),
-        n_replicates=n_replicates)
+    return true_mask_fraction, gpm.subset(np.sort(index))
@@ -1,7 +1,6 @@
 import numpy as np
-import random
 from gpmap.gpm import GenotypePhenotypeMap
-from gpmap import utils
+from gpmap import utils, distance
 from .base import random_mutation_set, BaseSimulation
 
 
@@ -105,10 +104,12 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
         self._roughness = None
         self._peak_n = peak_n
         self._peaks = peaks
+        self._fixed_peaks = peaks is not None
         self._min_dist = min_dist
         self._max_dist = max_dist
         self._a_state = a_state
         self._b_state = b_state
+        self._scale = np.empty(self.n, dtype=float)
         self.build()
 
     @classmethod
@@ -185,21 +186,58 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
             return self._peaks
         else:
             """Find n peaks that meet the max_dist/min_dist requirement"""
-            self._peaks = [self.b_state, self.a_state]
-            while len(self._peaks) < self.peak_n:
-                proposed = random.choice(self.genotypes)  # Propose a new peak.
-                add = False
-                for peak in self._peaks:
-                    dist = utils.hamming_distance(peak, proposed)
-                    if dist >= self.min_dist and dist <= self.max_dist:  # Check dist. requirements
-                        add = True
-                    else:
-                        add = False
-                        break
-                if add:
-                    self._peaks.append(proposed)
+            self._place_peaks()
             return self._peaks
 
+    def _place_peaks(self):
+        """Place `peak_n` peaks at random, starting from a_state and b_state.
+
+        A mask of genotypes that satisfy the min_dist/max_dist requirement
+        with every peak placed so far is updated as each peak is added, and
+        new peaks are drawn from it. Raises an Exception as soon as no
+        genotype is left to choose from.
+        """
+        array = utils.genotypes_to_array(self.genotypes)
+        candidates = np.ones(self.n, dtype=bool)
+        peaks = []
+        hamming = []
+
+        def add_peak(peak):
+            d = distance.hamming(utils.genotypes_to_array([peak])[0], array)
+            candidates[(d < self.min_dist) | (d > self.max_dist)] = False
+            peaks.append(peak)
+            hamming.append(d)
+
+        add_peak(self.b_state)
+        add_peak(self.a_state)
+        while len(peaks) < self.peak_n:
+            index = np.flatnonzero(candidates)
+            if len(index) == 0:
+                raise Exception("Could not place {} peaks: no genotype is "
+                                "left within min_dist={} and max_dist={} of "
+                                "the {} peaks placed.".format(
+                                    self.peak_n, self.min_dist,
+                                    self.max_dist, len(peaks)))
+            add_peak(self.genotypes[self.rng.choice(index)])
+
+        self._peaks = peaks
+        # The distances from each peak come for free.
+        self._reset_hamming()
+        self._hamming = np.array(hamming)
+
+    @peaks.setter
+    def peaks(self, peaks):
+        """Set the peaks and rebuild the map."""
+        self._peaks = peaks
+        self._fixed_peaks = peaks is not None
+        self._reset_hamming()
+        self.build()
+
+    def _reset_hamming(self):
+        """Clear the distance fields computed from the peaks."""
+        for attr in ("_hamming", "_hamming_min", "_hamming_max"):
+            self.__dict__.pop(attr, None)
+
     @property
     def hamming(self):
         """Hamming distances from each peak"""
@@ -207,13 +245,27 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
             return self._hamming
         # calculate the hamming distance if not done already
         except AttributeError:
-            hd = np.empty([len(self.peaks), len(self.genotypes)], dtype=int)
-            for i, peak in enumerate(self.peaks):
-                for j, g in enumerate(self.genotypes):
-                    hd[i][j] = utils.hamming_distance(peak, g)
-            self._hamming = hd
+            self._hamming = distance.hamming(self.peaks, self.genotypes)
             return self._hamming
 
+    @property
+    def hamming_min(self):
+        """Hamming distance from each genotype to its nearest peak."""
+        try:
+            return self._hamming_min
+        except AttributeError:
+            self._hamming_min = self.hamming.min(axis=0)
+            return self._hamming_min
+
+    @property
+    def hamming_max(self):
+        """Hamming distance from each genotype to its farthest peak."""
+        try:
+            return self._hamming_max
+        except AttributeError:
+            self._hamming_max = self.hamming.max(axis=0)
+            return self._hamming_max
+
     @property
     def peak_n(self):
         """Number of peaks"""
@@ -245,7 +297,7 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
 
         elif self.roughness_dist == 'normal':
             # Set roughness.
-            self._roughness = np.random.normal(
+            self._roughness = self.rng.normal(
                 scale=self.roughness_width,
                 size=self.n)
 
@@ -253,7 +305,7 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
 
         elif self.roughness_dist == 'uniform':
             # Set roughness.
-            self._roughness = np.random.uniform(
+            self._roughness = self.rng.uniform(
                 high=self.roughness_width,
                 low=-self.roughness_width,
                 size=self.n)
@@ -309,16 +361,32 @@ class MultiPeakMountFujiSimulation(BaseSimulation):
     @property
     def scale(self):
         """Multipeak Mt. Fuji phenotypes without noise."""
-        hd = np.empty([len(self.peaks), len(self.genotypes)])
-        for i, peak in enumerate(self.peaks):
-            newrow = self.hamming[i] * self.field_strength
-            hd[i] = newrow
-
-        min_hd = hd.min(0)  # Column-wise minimum value of array.
+        return self._build_scale().copy()
+
+    def _build_scale(self):
+        """Compute `scale` into a buffer that is reused on every build."""
+        c = self.field_strength
+        # Column-wise minimum of c * hamming. Scaling by c is monotone, so
+        # this is c times the nearest (c >= 0) or farthest (c < 0) peak.
+        if c >= 0:
+            hd = self.hamming_min
+        else:
+            hd = self.hamming_max
+        min_hd = np.multiply(hd, c, out=self._scale)
         max_min = np.amax(min_hd)  # Get the maximum value of the array for normalization.
-        self._scale = 1 - (min_hd / max_min)  # Subtract from one -> Larger hamming dist. from peak = lower phenotype.
+        # Subtract from one -> Larger hamming dist. from peak = lower phenotype.
+        np.divide(min_hd, max_min, out=self._scale)
+        np.subtract(1, self._scale, out=self._scale)
         return self._scale
 
+    def randomize(self, seed=None):
+        """Redraw the roughness (and peaks, unless they were given) and rebuild phenotypes."""
+        self._roughness = None
+        if not self._fixed_peaks:
+            self._peaks = None
+            self._reset_hamming()
+        return super(MultiPeakMountFujiSimulation, self).randomize(seed=seed)
+
     def build(self):
         """Construct phenotypes using a rough Mount Fuji model."""
-        self.data.phenotypes = self.roughness + self.scale
+        self.data.phenotypes = self.roughness + self._build_scale()
@@ -3,7 +3,7 @@ import itertools as it
 
 from gpmap.gpm import GenotypePhenotypeMap
 from gpmap import utils
-from .base import random_mutation_set, BaseSimulation
+from .base import random_mutation_set, get_rng, BaseSimulation
 
 
 class NKSimulation(BaseSimulation):
@@ -78,10 +78,19 @@ class NKSimulation(BaseSimulation):
         """
         if hasattr(self, "keys") is False:
             raise Exception("Need to set K first. Try `set_order` method.")
-        self._values = np.random.uniform(k_range[0], k_range[1],
-                                         size=len(self.keys))
+        self.k_range = k_range
+        self._values = self.rng.uniform(k_range[0], k_range[1],
+                                        size=len(self.keys))
         self.build()
 
+    def randomize(self, seed=None):
+        """Redraw the values of the NK table from `k_range` and rebuild
+        phenotypes."""
+        if seed is not None:
+            self.rng = get_rng(seed)
+        self.set_random_values(k_range=self.k_range)
+        return self
+
     def set_table_values(self, values):
         """Set the values of the NK table from a list/array of values.
         """
@@ -92,32 +101,97 @@ class NKSimulation(BaseSimulation):
         self._values = values
         self.build()
 
+    def _windows(self):
+        """Columns of the binary representation that make up each of the
+        K-windows of a genotype, in the order they are joined to form an NK
+        table key.
+        """
+        return get_windows(self.length, self.order,
+                           width=self.binary_matrix.shape[1])
+
     def build(self):
         """Build phenotypes from NK table.
+
+        Each K-window of every genotype is read as a binary number, which is
+        the index of its key in the NK table, and the table values are
+        gathered and summed across windows.
         """
-        nk_table = self.nk_table
-        # Check for even interaction
-        neighbor = int(self.order / 2)
-        if self.order % 2 == 0:
-            pre_neighbor = neighbor - 1
-        else:
-            pre_neighbor = neighbor
-        # Use NK table to build phenotypes
+        windows = self._windows()
+        values = np.asarray(self.values, dtype=float)
+        # One contiguous row per binary column.
+        binary = np.ascontiguousarray(self.binary_matrix.T)
+
+        # Process genotypes in chunks to bound the size of the key array.
+        chunksize = max(1, 2**22 // max(self.length, 1))
         phenotypes = np.zeros(self.n, dtype=float)
-        for i in range(len(self.genotypes)):
-            f_total = 0
-            for j in range(self.length):
-                if j - pre_neighbor < 0:
-                    pre = self.binary[i][-pre_neighbor:]
-                    post = self.binary[i][j:neighbor + j + 1]
-                    f = "".join(pre) + "".join(post)
-                elif j + neighbor > self.length - 1:
-                    pre = self.binary[i][j - pre_neighbor:j + 1]
-                    post = self.binary[i][0:neighbor]
-                    f = "".join(pre) + "".join(post)
-                else:
-                    f = "".join(
-                        self.binary[i][j - pre_neighbor:j + neighbor + 1])
-                f_total += nk_table[f]
-            phenotypes[i] = f_total
+        for start in range(0, self.n, chunksize):
+            stop = min(start + chunksize, self.n)
+            phenotypes[start:stop] = sum_windows(binary[:, start:stop],
+                                                 windows, values)
         self.data.phenotypes = phenotypes
+
+
+def get_windows(length, order, width=None):
+    """Columns of the binary representation of genotypes with `length` sites
+    that make up each of the K-windows (K=`order`) of an NK model. `width`
+    is the number of bits per genotype, `length` by default.
+
+    Returns
+    -------
+    windows : numpy.ndarray
+        (length, order) array of column indices, in the order they are joined
+        to form an NK table key.
+    """
+    # Check for even interaction
+    neighbor = int(order / 2)
+    if order % 2 == 0:
+        pre_neighbor = neighbor - 1
+    else:
+        pre_neighbor = neighbor
+
+    # Slice a list of column indices the same way binary strings are
+    # sliced into windows.
+    if width is None:
+        width = length
+    index = list(range(width))
+    windows = []
+    for j in range(length):
+        if j - pre_neighbor < 0:
+            window = index[-pre_neighbor:] + index[j:neighbor + j + 1]
+        elif j + neighbor > length - 1:
+            window = index[j - pre_neighbor:j + 1] + index[0:neighbor]
+        else:
+            window = index[j - pre_neighbor:j + neighbor + 1]
+        if len(window) != order:
+            raise Exception("Window at site %d does not have length K."
+                            % (j,))
+        windows.append(window)
+    return np.array(windows, dtype=np.int64).reshape(length, order)
+
+
+def sum_windows(binary, windows, values):
+    """Sum the NK table values of the K-windows of a set of genotypes.
+
+    Parameters
+    ----------
+    binary : numpy.ndarray
+        (length, n) binary representation of n genotypes, one row per bit.
+    windows : numpy.ndarray
+        windows of the model (see `get_windows`).
+    values : numpy.ndarray
+        NK table values, indexed by the binary number of each key.
+
+    Returns
+    -------
+    phenotypes : numpy.ndarray
+        phenotype of each genotype.
+    """
+    keys = np.zeros((len(windows), binary.shape[1]), dtype=np.intp)
+    for k in range(windows.shape[1]):
+        keys <<= 1
+        keys |= binary[windows[:, k]]
+    # Sum windows in site order, as in the NK definition.
+    f_total = np.zeros(binary.shape[1], dtype=float)
+    for j in range(len(windows)):
+        f_total += values[keys[j]]
+    return f_total
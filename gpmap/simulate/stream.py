@@ -0,0 +1,240 @@
+import numpy as np
+
+from gpmap import utils
+from gpmap.gpm import GenotypePhenotypeMap
+from gpmap.space import GenotypeSpace
+from .base import random_mutation_set, get_rng
+from .nk import get_windows, sum_windows
+
+
+class StreamingSimulation(object):
+    """Simulate phenotypes for a genotype space without holding its genotypes
+    in memory.
+
+    Phenotypes are generated chunk by chunk over the integer codes of the
+    space (see `GenotypeSpace`) and written to a float array ordered by code.
+    If a `filename` is given, that array is a memory-mapped .npy file, so
+    memory stays proportional to `chunksize` however large the space is.
+    Subsets can be queried or sampled as GenotypePhenotypeMaps.
+
+    Parameters
+    ----------
+    wildtype : str
+        reference genotype.
+
+    mutations : dict
+        mutations alphabet for each site.
+
+    chunksize : int
+        number of genotypes simulated at a time.
+
+    filename : str (optional)
+        .npy file to store the phenotypes in. If None, phenotypes are kept
+        in memory.
+
+    seed : None, int or numpy.random.Generator
+        seed for the random number generator (see `get_rng`).
+    """
+    chunksize = 2**16
+
+    def __init__(self, wildtype, mutations, chunksize=None, filename=None,
+                 seed=None):
+        self.space = GenotypeSpace(wildtype, mutations)
+        self.encoding_table = utils.get_encoding_table(
+            self.wildtype, self.mutations)
+        if chunksize is not None:
+            self.chunksize = chunksize
+        self.filename = filename
+        self.rng = get_rng(seed)
+
+        if filename is None:
+            self.phenotypes = np.empty(self.n, dtype=float)
+        else:
+            self.phenotypes = np.lib.format.open_memmap(
+                filename, mode="w+", dtype=float, shape=(self.n,))
+
+    @classmethod
+    def from_length(cls, length, alphabet_size=2, *args, **kwargs):
+        """Create a streaming simulation from a given genotype length (see
+        `BaseSimulation.from_length`)."""
+        rng = get_rng(kwargs.get("seed"))
+        mutations = random_mutation_set(length, alphabet_size=alphabet_size,
+                                        rng=rng)
+        wildtype = "".join([m[0] for m in mutations.values()])
+        return cls(wildtype, mutations, *args, **kwargs)
+
+    @property
+    def wildtype(self):
+        """Reference genotype."""
+        return self.space.wildtype
+
+    @property
+    def mutations(self):
+        """Mutations dictionary."""
+        return self.space.mutations
+
+    @property
+    def length(self):
+        """Length of the genotypes."""
+        return self.space.length
+
+    @property
+    def n(self):
+        """Number of genotypes in the space."""
+        return self.space.size
+
+    def _build_chunk(self, codes):
+        """Phenotypes of a chunk of integer codes."""
+        raise Exception("must be implemented in subclass.")
+
+    def build(self):
+        """Simulate the phenotypes of every genotype, chunk by chunk."""
+        for start in range(0, self.n, self.chunksize):
+            stop = min(start + self.chunksize, self.n)
+            codes = np.arange(start, stop, dtype=np.int64)
+            self.phenotypes[start:stop] = self._build_chunk(codes)
+        if isinstance(self.phenotypes, np.memmap):
+            self.phenotypes.flush()
+        return self
+
+    def randomize(self, seed=None):
+        """Redraw the random parameters of the simulation and rebuild its
+        phenotypes."""
+        if seed is not None:
+            self.rng = get_rng(seed)
+        return self.build()
+
+    def iter_chunks(self, chunksize=None):
+        """Iterate over genotypes and phenotypes in chunks.
+
+        Yields
+        ------
+        genotypes : numpy.ndarray
+            genotypes in the chunk.
+        phenotypes : numpy.ndarray
+            phenotypes of the genotypes.
+        """
+        chunksize = chunksize or self.chunksize
+        for start in range(0, self.n, chunksize):
+            stop = min(start + chunksize, self.n)
+            yield self.space[start:stop], np.asarray(self.phenotypes[start:stop])
+
+    def query(self, genotypes):
+        """Phenotypes of a genotype or list of genotypes."""
+        codes = self.space.index_of(genotypes)
+        if isinstance(genotypes, str):
+            return float(self.phenotypes[codes])
+        return np.asarray(self.phenotypes[codes])
+
+    def subset(self, codes, **kwargs):
+        """Build a GenotypePhenotypeMap of the genotypes at the given integer
+        codes. Keyword arguments are passed to GenotypePhenotypeMap.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        return GenotypePhenotypeMap(
+            self.wildtype,
+            self.space.genotype_at(codes),
+            np.asarray(self.phenotypes[codes]),
+            mutations=self.mutations,
+            **kwargs)
+
+    def sample(self, n, replace=False, seed=None, **kwargs):
+        """Sample genotypes uniformly and build a GenotypePhenotypeMap of
+        them (see `GenotypeSpace.sample`)."""
+        _, codes = self.space.sample(n, replace=replace, seed=seed,
+                                     return_indices=True)
+        return self.subset(np.sort(codes), **kwargs)
+
+
+class StreamingRandomSimulation(StreamingSimulation):
+    """Streaming simulation of uniformly random phenotypes (see
+    `RandomPhenotypesSimulation`)."""
+
+    def __init__(self, wildtype, mutations, phenotype_range=(0, 1),
+                 *args, **kwargs):
+        super(StreamingRandomSimulation, self).__init__(wildtype, mutations,
+                                                        *args, **kwargs)
+        self.phenotype_range = phenotype_range
+        self.build()
+
+    def _build_chunk(self, codes):
+        low, high = self.phenotype_range[0], self.phenotype_range[1]
+        return self.rng.uniform(low, high, size=len(codes))
+
+
+class StreamingNKSimulation(StreamingSimulation):
+    """Streaming simulation of an NK model (see `NKSimulation`)."""
+
+    def __init__(self, wildtype, mutations, K, k_range=(0, 1),
+                 *args, **kwargs):
+        super(StreamingNKSimulation, self).__init__(wildtype, mutations,
+                                                    *args, **kwargs)
+        self.K = K
+        self.order = K
+        _, width = utils.get_encoding_lookup(self.encoding_table)
+        self._windows = get_windows(self.length, self.order, width=width)
+        self.set_random_values(k_range=k_range)
+
+    @property
+    def values(self):
+        """NK table values, indexed by the binary number of each key."""
+        return self._values
+
+    def set_random_values(self, k_range=(0, 1)):
+        """Set the values of the NK table by drawing from a uniform
+        distribution between the given k_range.
+        """
+        self.k_range = k_range
+        self._values = self.rng.uniform(k_range[0], k_range[1],
+                                        size=2**self.K)
+        self.build()
+
+    def randomize(self, seed=None):
+        """Redraw the values of the NK table and rebuild phenotypes."""
+        if seed is not None:
+            self.rng = get_rng(seed)
+        self.set_random_values(k_range=self.k_range)
+        return self
+
+    def _build_chunk(self, codes):
+        array = utils.codes_to_array(codes, self.mutations,
+                                     wildtype=self.wildtype)
+        binary = utils.array_to_binary(array, self.encoding_table)
+        return sum_windows(np.ascontiguousarray(binary.T), self._windows,
+                           np.asarray(self.values, dtype=float))
+
+
+class StreamingMountFujiSimulation(StreamingSimulation):
+    """Streaming simulation of a Mount Fuji model (see
+    `MountFujiSimulation`)."""
+
+    def __init__(self, wildtype, mutations, field_strength=1,
+                 roughness_width=None, roughness_dist='normal',
+                 *args, **kwargs):
+        super(StreamingMountFujiSimulation, self).__init__(wildtype, mutations,
+                                                           *args, **kwargs)
+        if roughness_dist not in ['normal', 'uniform']:
+            raise AttributeError('roughness_dist must be '
+                                 'either normal or uniform')
+        self.field_strength = field_strength
+        self.roughness_width = roughness_width
+        self.roughness_dist = roughness_dist
+        self._reference = utils.genotypes_to_array([self.wildtype])[0]
+        self.build()
+
+    def _build_chunk(self, codes):
+        array = utils.codes_to_array(codes, self.mutations,
+                                     wildtype=self.wildtype)
+        hamming = np.count_nonzero(array != self._reference, axis=1)
+        scale = self.field_strength * hamming
+
+        if self.roughness_width is None:
+            roughness = np.zeros(len(codes))
+        elif self.roughness_dist == 'normal':
+            roughness = self.rng.normal(scale=self.roughness_width,
+                                        size=len(codes))
+        else:
+            roughness = self.rng.uniform(high=self.roughness_width,
+                                         low=-self.roughness_width,
+                                         size=len(codes))
+        return roughness + scale
@@ -0,0 +1,211 @@
+import numpy as np
+
+from .base import get_rng, BaseSimulation
+
+
+def fwht(a):
+    """Fast Walsh-Hadamard transform, in place, along the first axis.
+
+    Computes `H @ a` in O(n log n), where H is the (unnormalized, Sylvester
+    ordered) n x n Hadamard matrix, `H[i, j] = (-1)**popcount(i & j)`.
+
+    Parameters
+    ----------
+    a : numpy.ndarray
+        C-contiguous array whose first axis has a length that is a power
+        of 2. It is overwritten with the result.
+
+    Returns
+    -------
+    a : numpy.ndarray
+        the transformed input.
+    """
+    n = len(a)
+    if n == 0 or n & (n - 1):
+        raise Exception("Length of the array must be a power of 2.")
+    if not a.flags.c_contiguous:
+        raise Exception("Array must be C-contiguous.")
+
+    buffer = np.empty((n // 2,) + a.shape[1:], dtype=a.dtype)
+    h = 1
+    while h < n:
+        # Pair up the entries h apart: (x, y) -> (x + y, x - y).
+        blocks = a.reshape((-1, 2, h) + a.shape[1:])
+        x, y = blocks[:, 0], blocks[:, 1]
+        diff = buffer.reshape(x.shape)
+        np.subtract(x, y, out=diff)
+        x += y
+        y[...] = diff
+        h *= 2
+    return a
+
+
+def ifwht(a):
+    """Inverse fast Walsh-Hadamard transform, in place, along the first axis
+    (see `fwht`)."""
+    fwht(a)
+    a /= len(a)
+    return a
+
+
+def _bit_integers(gpm):
+    """Integer of each genotype's binary representation, first site as the
+    most significant bit."""
+    binary = gpm.binary_matrix
+    ints = np.zeros(len(binary), dtype=np.int64)
+    for j in range(binary.shape[1]):
+        ints <<= 1
+        ints |= binary[:, j]
+    return ints
+
+
+def _check_biallelic(gpm):
+    """Raise an Exception unless every site of the map has at most two
+    states."""
+    if any(len(alphabet) > 2 for alphabet in gpm.mutations.values()
+           if alphabet is not None):
+        raise Exception("Walsh-Hadamard transforms need a biallelic map.")
+
+
+def walsh_orders(width):
+    """Order (number of interacting sites) of each Walsh coefficient of a
+    map whose binary representation has `width` bits."""
+    index = np.arange(2**width, dtype=np.int64)
+    orders = np.zeros(len(index), dtype=np.int64)
+    for i in range(width):
+        orders += (index >> i) & 1
+    return orders
+
+
+def get_walsh_coefs(gpm):
+    """Walsh coefficients of a complete, biallelic genotype-phenotype map.
+
+    Phenotypes are modelled as
+
+    .. math::
+
+        f(g) = \\sum_S \\beta_S \\prod_{i \\in S} x_i(g)
+
+    where $x_i(g)$ is +1 if site $i$ of $g$ is wildtype and -1 if it is
+    mutated. Coefficient $\\beta_S$ is at the index whose binary
+    representation (first site as the most significant bit) marks the sites
+    in $S$. Computed with an inverse fast Walsh-Hadamard transform in
+    O(n log n).
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        complete, biallelic map.
+
+    Returns
+    -------
+    coefs : numpy.ndarray
+        Walsh coefficients.
+    """
+    _check_biallelic(gpm)
+    width = gpm.binary_matrix.shape[1]
+    ints = _bit_integers(gpm)
+    seen = np.zeros(2**width, dtype=bool)
+    seen[ints] = True
+    if len(ints) != 2**width or not seen.all():
+        raise Exception("The genotype-phenotype map must be complete.")
+
+    coefs = np.empty(len(ints), dtype=float)
+    coefs[ints] = gpm.phenotypes
+    return ifwht(coefs)
+
+
+class WalshHadamardSimulation(BaseSimulation):
+    """Build a biallelic genotype-phenotype map from Walsh (Fourier)
+    coefficients drawn for each order of epistasis.
+
+    Phenotypes are synthesized from the coefficients with a fast
+    Walsh-Hadamard transform in O(n log n) (see `get_walsh_coefs` for the
+    model).
+
+    Parameters
+    ----------
+    wildtype : str
+        reference genotype.
+
+    mutations : dict
+        mutations alphabet for each site; at most two states per site.
+
+    widths : list
+        width of the coefficient distribution for each order, starting at
+        first order (additive). Orders beyond the list are zero.
+
+    dist : str, 'normal'
+        distribution of the coefficients: 'normal' (widths are standard
+        deviations) or 'uniform' (coefficients between -width and width).
+
+    intercept : float
+        zeroth order coefficient (mean phenotype).
+
+    Attributes
+    ----------
+    coefs : numpy.ndarray
+        Walsh coefficients.
+    orders : numpy.ndarray
+        order of each coefficient.
+    """
+
+    def __init__(self, wildtype, mutations, widths=(1,), dist='normal',
+                 intercept=0.0, *args, **kwargs):
+        super(WalshHadamardSimulation, self).__init__(wildtype, mutations,
+                                                      *args, **kwargs)
+        _check_biallelic(self)
+        self.orders = walsh_orders(self.binary_matrix.shape[1])
+        self._bit_integers = _bit_integers(self)
+        self.set_random_coefs(widths=widths, dist=dist, intercept=intercept)
+
+    @property
+    def coefs(self):
+        """Walsh coefficients."""
+        return self._coefs
+
+    def set_random_coefs(self, widths=(1,), dist='normal', intercept=0.0):
+        """Draw the coefficients of each order from a distribution with the
+        given width.
+        """
+        if dist not in ('normal', 'uniform'):
+            raise Exception("dist must be either normal or uniform.")
+        self.widths = widths
+        self.dist = dist
+        self.intercept = intercept
+
+        scale = np.zeros(self.orders.max() + 1, dtype=float)
+        n_orders = min(len(widths), len(scale) - 1)
+        scale[1:n_orders + 1] = widths[:n_orders]
+        scale = scale[self.orders]
+
+        if dist == 'normal':
+            coefs = self.rng.normal(size=len(scale))
+        else:
+            coefs = self.rng.uniform(-1, 1, size=len(scale))
+        coefs *= scale
+        coefs[0] = intercept
+        self._coefs = coefs
+        self.build()
+
+    def set_coefs(self, coefs):
+        """Set the Walsh coefficients from a list/array."""
+        coefs = np.asarray(coefs, dtype=float)
+        if len(coefs) != len(self.orders):
+            raise Exception("Length of the coefficients must be %d."
+                            % len(self.orders))
+        self._coefs = coefs
+        self.build()
+
+    def randomize(self, seed=None):
+        """Redraw the coefficients and rebuild phenotypes."""
+        if seed is not None:
+            self.rng = get_rng(seed)
+        self.set_random_coefs(widths=self.widths, dist=self.dist,
+                              intercept=self.intercept)
+        return self
+
+    def build(self):
+        """Build phenotypes from the coefficients."""
+        phenotypes = fwht(np.array(self.coefs, dtype=float))
+        self.data.phenotypes = phenotypes[self._bit_integers]
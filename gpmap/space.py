@@ -0,0 +1,206 @@
+# Virtual genotype space defined by a wildtype and mutations dictionary
+#
+# ----------------------------------------------------------
+# Outside imports
+# ----------------------------------------------------------
+
+import numpy as np
+
+# ----------------------------------------------------------
+# Local imports
+# ----------------------------------------------------------
+
+import gpmap.utils as utils
+
+
+class GenotypeSpace(object):
+    """The complete set of genotypes given by a mutations dictionary, without
+    enumerating it.
+
+    Genotypes are ordered by their mixed-radix integer code (see
+    `utils.genotypes_to_codes`), i.e. in the same order as
+    `utils.mutations_to_genotypes`. Any genotype can be computed from its
+    index and vice versa, so spaces far too large to list can be sliced,
+    iterated over in chunks and sampled.
+
+    Parameters
+    ----------
+    wildtype : string
+        wildtype sequence.
+
+    mutations : dict
+        Dictionary that maps each site indice to their possible substitution
+        alphabet.
+
+    Examples
+    --------
+    >>> space = GenotypeSpace("AA", {0: ["A", "B"], 1: ["A", "B"]})
+    >>> len(space)
+    4
+    >>> space[1]
+    'AB'
+    >>> space.index_of(["BA", "BB"])
+    array([2, 3])
+    """
+    def __init__(self, wildtype, mutations):
+        self._wildtype = wildtype
+        self._mutations = dict([(int(key), val)
+                                for key, val in mutations.items()])
+        self._radices, self._weights, self._size = utils.get_code_radices(
+            self._mutations,
+            wildtype=self._wildtype
+        )
+
+    def __repr__(self):
+        return "GenotypeSpace(wildtype={!r}, size={})".format(
+            self.wildtype, self.size)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        """Get a genotype, slice of genotypes or array of genotypes by
+        index."""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._size)
+            return self.genotype_at(np.arange(start, stop, step))
+
+        if np.ndim(key) == 0:
+            index = int(key)
+            if index < 0:
+                index += self._size
+            return self.genotype_at(index)
+
+        indices = np.asarray(key)
+        if indices.dtype == bool:
+            raise IndexError("Boolean masks are not supported.")
+        indices = np.where(indices < 0, indices + self._size, indices)
+        return self.genotype_at(indices)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            for genotype in chunk:
+                yield str(genotype)
+
+    def __contains__(self, genotype):
+        try:
+            self.index_of(genotype)
+        except Exception:
+            return False
+        return True
+
+    @property
+    def wildtype(self):
+        """Reference genotype."""
+        return self._wildtype
+
+    @property
+    def mutations(self):
+        """Mutations dictionary."""
+        return self._mutations
+
+    @property
+    def length(self):
+        """Length of the genotypes."""
+        return len(self._radices)
+
+    @property
+    def size(self):
+        """Number of genotypes in the space."""
+        return self._size
+
+    def genotype_at(self, indices):
+        """Get the genotypes at given indices (integer codes).
+
+        Parameters
+        ----------
+        indices : int or array-like
+            positions in the space.
+
+        Returns
+        -------
+        genotypes : str or numpy.ndarray
+            genotype at each index.
+        """
+        genotypes = utils.codes_to_genotypes(
+            np.atleast_1d(indices),
+            self._mutations,
+            wildtype=self._wildtype
+        )
+        if np.ndim(indices) == 0:
+            return str(genotypes[0])
+        return genotypes
+
+    def index_of(self, genotypes):
+        """Get the indices (integer codes) of genotypes in the space.
+
+        Parameters
+        ----------
+        genotypes : str or array-like
+            genotype or list of genotypes.
+
+        Returns
+        -------
+        indices : int or numpy.ndarray
+            position of each genotype in the space.
+        """
+        scalar = isinstance(genotypes, str)
+        codes = utils.genotypes_to_codes(
+            np.atleast_1d(genotypes),
+            self._mutations,
+            wildtype=self._wildtype
+        )
+        if scalar:
+            return int(codes[0])
+        return codes
+
+    def iter_chunks(self, chunksize=2**16, start=0, stop=None):
+        """Iterate over the space in chunks of genotypes.
+
+        Parameters
+        ----------
+        chunksize : int
+            number of genotypes per chunk.
+        start, stop : int
+            range of indices to iterate over.
+
+        Yields
+        ------
+        genotypes : numpy.ndarray
+            genotypes in the chunk.
+        """
+        if stop is None:
+            stop = self._size
+        for i in range(start, stop, chunksize):
+            yield self.genotype_at(np.arange(i, min(i + chunksize, stop)))
+
+    def sample(self, n, replace=True, seed=None, return_indices=False):
+        """Sample genotypes uniformly from the space.
+
+        Parameters
+        ----------
+        n : int
+            number of genotypes to sample.
+        replace : bool (default=True)
+            sample with replacement.
+        seed : int, numpy.random.Generator or None
+            seed for the random number generator.
+        return_indices : bool (default=False)
+            return the sampled indices as well.
+
+        Returns
+        -------
+        genotypes : numpy.ndarray
+            sampled genotypes.
+        indices : numpy.ndarray
+            indices of the sampled genotypes (if `return_indices`).
+        """
+        rng = np.random.default_rng(seed)
+        if replace:
+            indices = rng.integers(0, self._size, size=n, dtype=np.int64)
+        else:
+            indices = rng.choice(self._size, size=n, replace=False)
+        genotypes = self.genotype_at(indices)
+        if return_indices:
+            return genotypes, indices
+        return genotypes
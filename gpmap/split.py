@@ -0,0 +1,118 @@
+__doc__ = """Train/test splits of a genotype-phenotype map.
+
+Each generator yields `(train, test)` pairs of sorted index arrays (positions
+in the map), or, with `return_maps=True`, pairs of maps built with
+`GenotypePhenotypeMap.subset`, which share the encoding of the original map.
+All randomness comes from a single seeded numpy Generator.
+"""
+
+import numpy as np
+
+
+def _n_test(n, test_fraction):
+    """Number of genotypes in a test set."""
+    if test_fraction > 1 or test_fraction < 0:
+        raise Exception("test_fraction must be between 0 and 1.")
+    return int(round(test_fraction * n))
+
+
+def _output(gpm, test, return_maps):
+    """Turn a boolean test mask into a (train, test) pair."""
+    if return_maps:
+        return gpm.subset(~test), gpm.subset(test)
+    return np.flatnonzero(~test), np.flatnonzero(test)
+
+
+def random_split(gpm, test_fraction=0.2, n_splits=1, seed=None,
+                 return_maps=False):
+    """Random train/test splits.
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map to split.
+    test_fraction : float
+        fraction of genotypes in each test set.
+    n_splits : int
+        number of splits.
+    seed : None, int or numpy.random.Generator
+        seed for the random number generator.
+    return_maps : bool (default=False)
+        yield maps instead of index arrays.
+
+    Yields
+    ------
+    train, test : numpy.ndarray or GenotypePhenotypeMap
+        positions (or maps) of the training and test genotypes.
+    """
+    rng = np.random.default_rng(seed)
+    n_test = _n_test(gpm.n, test_fraction)
+    for _ in range(n_splits):
+        test = np.zeros(gpm.n, dtype=bool)
+        test[rng.choice(gpm.n, n_test, replace=False)] = True
+        yield _output(gpm, test, return_maps)
+
+
+def stratified_split(gpm, test_fraction=0.2, n_splits=1, strata=None,
+                     seed=None, return_maps=False):
+    """Random train/test splits that keep the same fraction of each stratum
+    (by default, each number of mutations) in the test set.
+
+    Parameters
+    ----------
+    strata : array-like (optional)
+        stratum of each genotype. Defaults to `gpm.n_mutations`.
+
+    See `random_split` for the other parameters.
+    """
+    rng = np.random.default_rng(seed)
+    if strata is None:
+        strata = gpm.n_mutations
+    _, strata, sizes = np.unique(strata, return_inverse=True,
+                                 return_counts=True)
+    strata = strata.ravel()
+    n_test = np.array([_n_test(size, test_fraction) for size in sizes])
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    for _ in range(n_splits):
+        # Rank genotypes by a random key within each stratum, and put the
+        # first n_test of each stratum in the test set.
+        order = np.lexsort((rng.random(gpm.n), strata))
+        rank = np.arange(gpm.n) - starts[strata[order]]
+        test = np.zeros(gpm.n, dtype=bool)
+        test[order] = rank < n_test[strata[order]]
+        yield _output(gpm, test, return_maps)
+
+
+def kfold(gpm, n_folds=5, n_repeats=1, shuffle=True, seed=None,
+          return_maps=False):
+    """K-fold splits: each genotype is in the test set of exactly one fold
+    (per repeat).
+
+    Parameters
+    ----------
+    n_folds : int
+        number of folds.
+    n_repeats : int
+        number of times to repeat the k-fold with a new shuffle.
+    shuffle : bool (default=True)
+        shuffle genotypes before assigning folds. If False, folds are
+        contiguous blocks of the map.
+
+    See `random_split` for the other parameters.
+    """
+    if n_folds < 2 or n_folds > gpm.n:
+        raise Exception("n_folds must be between 2 and the number of "
+                        "genotypes.")
+    rng = np.random.default_rng(seed)
+    # Fold of each position in the (shuffled) order.
+    folds = np.arange(gpm.n) * n_folds // gpm.n
+
+    for _ in range(n_repeats):
+        if shuffle:
+            assignment = np.empty(gpm.n, dtype=np.int64)
+            assignment[rng.permutation(gpm.n)] = folds
+        else:
+            assignment = folds
+        for fold in range(n_folds):
+            yield _output(gpm, assignment == fold, return_maps)
@@ -6,18 +6,14 @@ import math
 # -----------------------------------------------------------------------
 
 def coverage(gpm):
-    # Get binary representation
-    binary = gpm.binary
-
-    # Determine shape of obs matrix
-    shape = (len(binary), len(binary[0]))
-
-    # Initialize obs matrix
-    obs_matrix = np.array([np.array(list(b)) for b in binary], dtype=int)
+    """Return the number of genotypes in which each mutation (column of the
+    binary representation) is observed."""
+    # Get binary representation as a (n, width) matrix
+    obs_matrix = gpm.binary_matrix
 
     # Compute the average times each mutation is observed
-    observations = obs_matrix.sum(axis=0)
-
+    observations = obs_matrix.sum(axis=0, dtype=np.int64)
+    return observations
 
 
 def c4_correction(n_samples):
@@ -0,0 +1,225 @@
+__doc__ = """Native on-disk format for genotype-phenotype maps.
+
+A map is saved as a directory of raw NumPy (.npy) arrays, one per column,
+plus a small `header.json` holding the wildtype, mutations, encoding table
+and metadata::
+
+    map/
+        header.json
+        genotypes.npy       # fixed-width bytes
+        phenotypes.npy
+        stdeviations.npy    # omitted if no standard deviations are set
+        n_replicates.npy
+        n_mutations.npy
+        codes.npy           # omitted if the space is too large for codes
+        binary_packed.npy   # (n, n_bytes) uint8
+
+Arrays can be opened as read-only memory maps, so opening a map takes
+milliseconds whatever its size, pages are loaded on demand, and processes
+that open the same map share one copy of the data through the page cache.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+import gpmap.utils as utils
+
+
+# Version of the format written by `save`.
+FORMAT_VERSION = 1
+
+# Name of the header file in a map directory.
+HEADER = "header.json"
+
+# Data columns (besides genotypes) stored by default, in data order.
+DATA_COLUMNS = ["phenotypes", "n_replicates", "stdeviations"]
+
+# Derived columns stored with the data.
+DERIVED_COLUMNS = ["n_mutations", "codes"]
+
+
+def _encoding_table_to_dict(encoding_table):
+    """Store an encoding table as json-compatible lists plus dtypes."""
+    return {
+        "data": json.loads(encoding_table.to_json(orient="split",
+                                                  index=False)),
+        "dtypes": dict((col, str(dtype)) for col, dtype
+                       in encoding_table.dtypes.items()),
+    }
+
+
+def _dict_to_encoding_table(d):
+    """Rebuild an encoding table stored by `_encoding_table_to_dict`."""
+    data = d["data"]
+    table = pd.DataFrame(data["data"], columns=data["columns"])
+    return table.astype(d["dtypes"])
+
+
+def map_to_arrays(gpm, objects=False):
+    """Split a GenotypePhenotypeMap into typed numpy arrays (see module
+    docstring) and a json-compatible header. Columns still held in source
+    arrays (e.g. memory-mapped by `load`) are used as is, without building
+    the `data` DataFrame.
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map to split.
+    objects : bool (default=False)
+        keep object columns (e.g. strings, lists, or values mixed with None)
+        as object arrays instead of converting them to strings. Object
+        arrays can be pickled, but not saved as .npy files.
+
+    Returns
+    -------
+    header : dict
+        wildtype, mutations, site labels, metadata and stored column names.
+    arrays : dict
+        array of each stored column, plus the derived columns and
+        `binary_packed`.
+    """
+    if gpm._data is None and gpm._source is not None:
+        names = list(gpm._source)
+    else:
+        names = list(gpm.data.columns)
+
+    columns = []
+    arrays = {}
+    for name in names:
+        if name in ("binary", "binary_packed") + tuple(DERIVED_COLUMNS):
+            continue
+        values = np.asarray(gpm._column(name))
+        if name == "genotypes":
+            if values.dtype.kind != "S":
+                values = values.astype(str).astype(bytes)
+        elif name == "stdeviations" and values.dtype == object:
+            if all(v is None for v in values):
+                # No standard deviations set.
+                continue
+            if not objects:
+                values = values.astype(float)
+        elif values.dtype == object or values.dtype.kind == "T":
+            if not objects:
+                values = values.astype(str)
+        if values.dtype.kind not in "biufcUS" + ("O" if objects else ""):
+            raise Exception("Column '{}' can't be saved.".format(name))
+        arrays[name] = values
+        columns.append(name)
+
+    # Spaces too large for integer codes have no codes column.
+    derived = [name for name in DERIVED_COLUMNS
+               if name != "codes" or gpm._codes_fit()]
+    for name in derived:
+        arrays[name] = np.asarray(getattr(gpm, name), dtype=np.int64)
+    arrays["binary_packed"] = np.ascontiguousarray(gpm.binary_packed)
+
+    header = {
+        "format": "gpmap",
+        "version": FORMAT_VERSION,
+        "n": gpm.n,
+        "wildtype": gpm.wildtype,
+        "mutations": gpm.mutations,
+        "site_labels": gpm._site_labels,
+        "include_binary": gpm._include_binary,
+        "binary_width": gpm.binary_matrix.shape[1],
+        "columns": columns,
+        "derived": derived,
+        "metadata": gpm.metadata,
+    }
+    return header, arrays
+
+
+def arrays_to_map(cls, header, arrays, encoding_table):
+    """Build a map from the output of `map_to_arrays`. Columns are read from
+    the arrays on demand; the `data` DataFrame is only built when it is
+    accessed."""
+    source = dict(arrays)
+    if "stdeviations" not in source:
+        source["stdeviations"] = np.full(header["n"], None, dtype=object)
+
+    cache = {
+        "binary_packed": source["binary_packed"],
+        "binary_width": header["binary_width"],
+        "encoding_table": encoding_table,
+    }
+    return cls._from_source(
+        header["wildtype"],
+        source,
+        header["mutations"],
+        site_labels=header.get("site_labels"),
+        include_binary=header.get("include_binary", False),
+        metadata=header.get("metadata", {}),
+        cache=cache)
+
+
+def save(gpm, path):
+    """Save a GenotypePhenotypeMap to a directory of .npy arrays (see
+    module docstring).
+
+    Parameters
+    ----------
+    gpm : GenotypePhenotypeMap
+        map to save.
+    path : str
+        directory to write. Created if it does not exist.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    header, arrays = map_to_arrays(gpm)
+    for name, values in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), values)
+
+    header["encoding_table"] = _encoding_table_to_dict(gpm.encoding_table)
+    with open(os.path.join(path, HEADER), "w") as f:
+        json.dump(header, f)
+
+
+def read_header(path):
+    """Read the header of a saved map."""
+    filename = os.path.join(path, HEADER)
+    if not os.path.exists(filename):
+        raise Exception("{} does not contain a GenotypePhenotypeMap."
+                        .format(path))
+    with open(filename, "r") as f:
+        header = json.load(f)
+    if header.get("format") != "gpmap" or header["version"] > FORMAT_VERSION:
+        raise Exception("Unsupported map format.")
+    return header
+
+
+def load(cls, path, mmap=True, **kwargs):
+    """Open a map saved with `save`. Keyword arguments override the header;
+    if they change the wildtype, mutations or site labels, the genotypes are
+    encoded again.
+
+    Data is read from the arrays on demand; the `data` DataFrame is only
+    built when it is accessed.
+    """
+    header = read_header(path)
+    reencode = utils.encoding_overridden(header, kwargs)
+    header.update(kwargs)
+    mmap_mode = "r" if mmap else None
+
+    if reencode:
+        # Stored encodings don't match the new wildtype/mutations.
+        columns = dict((name, np.load(os.path.join(path, name + ".npy")))
+                       for name in header["columns"])
+        return cls._from_columns(
+            header["wildtype"],
+            columns,
+            header["mutations"],
+            site_labels=header.get("site_labels"),
+            include_binary=header.get("include_binary", False),
+            metadata=header.get("metadata", {}))
+
+    arrays = {}
+    derived = header.get("derived", DERIVED_COLUMNS)
+    for name in header["columns"] + derived + ["binary_packed"]:
+        arrays[name] = np.load(os.path.join(path, name + ".npy"),
+                               mmap_mode=mmap_mode)
+    encoding_table = _dict_to_encoding_table(header["encoding_table"])
+    return arrays_to_map(cls, header, arrays, encoding_table)
@@ -0,0 +1,22 @@
+import pytest
+
+from gpmap.simulate import RandomPhenotypesSimulation
+
+
+@pytest.fixture
+def wildtype():
+    """Wildtype of the six site, two letter space used by the tests."""
+    return "AAAAAA"
+
+
+@pytest.fixture
+def mutations():
+    """Mutations of the six site, two letter space used by the tests."""
+    return dict([(i, ["A", "B"]) for i in range(6)])
+
+
+@pytest.fixture
+def random_map(wildtype, mutations):
+    """Seeded random map with a standard deviation on every phenotype."""
+    sim = RandomPhenotypesSimulation(wildtype, mutations, seed=1)
+    return sim.set_stdeviations(0.5)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from .. import distance, utils
+from .test_utils import GENOTYPES
+
+
+def test_hamming():
+    """Test hamming distance matrix against pairwise hamming distances."""
+    expected = [[utils.hamming_distance(g1, g2) for g2 in GENOTYPES]
+                for g1 in GENOTYPES]
+
+    assert distance.hamming(GENOTYPES, block_size=5).tolist() == expected
+    assert distance.hamming("AAA", GENOTYPES).tolist() == expected[0]
+
+
+def test_hamming_packed():
+    """Test hamming distance on packed bits."""
+    binary = np.array([[g == "B" for g in genotype] for genotype in GENOTYPES],
+                      dtype=np.uint8)
+    packed = np.packbits(binary, axis=1)
+
+    np.testing.assert_array_equal(
+        distance.hamming(packed, packed=True, n_jobs=2),
+        distance.hamming(GENOTYPES))
+
+
+def test_within():
+    """Test finding genotypes within a distance."""
+    index, distances = distance.within("AAA", GENOTYPES, 1)
+
+    assert index.tolist() == [0, 1, 2, 3]
+    assert distances.tolist() == [0, 1, 1, 1]
+
+
+def test_nearest():
+    """Test finding the nearest genotypes."""
+    index, distances = distance.nearest(GENOTYPES, GENOTYPES, k=1,
+                                        block_size=3)
+
+    assert index[:, 0].tolist() == list(range(len(GENOTYPES)))
+    assert distances[:, 0].tolist() == [0] * len(GENOTYPES)
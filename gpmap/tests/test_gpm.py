@@ -1,3 +1,12 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from ..gpm import GenotypePhenotypeMap
+from .test_utils import WILDTYPE, GENOTYPES, BINARY, MUTATIONS
+
 # import numpy as np
 # import pytest
 #
@@ -79,3 +88,275 @@
 #         # Test missing genotypes are returned
 #         np.testing.assert_array_equal(gpm.genotypes, chosen_g)
 #         np.testing.assert_array_equal(np.sort(gpm.missing_genotypes), np.sort(missing_g))
+
+
+def test_binary():
+    """Test the packed binary representation and on-demand strings."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, mutations=MUTATIONS)
+    assert "binary" not in gpm.data
+    assert gpm.binary.tolist() == BINARY
+    assert gpm.binary is gpm.binary
+    assert gpm.binary_matrix is gpm.binary_matrix
+    assert gpm.binary_matrix.shape == (8, 3)
+
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, mutations=MUTATIONS,
+                               include_binary=True)
+    assert gpm.data.binary.tolist() == BINARY
+
+
+def test_lazy():
+    """Test that lazy maps build derived structures on first access."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS, lazy=True)
+    assert "binary_packed" not in gpm._cache
+    assert "codes" not in gpm.data
+
+    eager = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                                 mutations=MUTATIONS)
+    np.testing.assert_array_equal(gpm.binary_packed, eager.binary_packed)
+    np.testing.assert_array_equal(gpm.n_mutations, eager.n_mutations)
+    np.testing.assert_array_equal(gpm.codes, eager.codes)
+    assert gpm.index_of(GENOTYPES[5]) == 5
+
+
+def test_reset_cache():
+    """Test that reassigning data clears derived structures."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    neighbors = gpm.neighbors()
+    assert gpm.neighbors() is neighbors
+    assert ("neighbors", False) in gpm._cache
+
+    # Labeled and unlabeled graphs are cached separately.
+    labeled = gpm.neighbors(labels=True)
+    assert ("neighbors", True) in gpm._cache
+    assert labeled is not neighbors
+    assert neighbors.nnz == labeled.nnz == 24
+
+    new = GenotypePhenotypeMap(WILDTYPE, GENOTYPES[:4], np.arange(4.0),
+                               mutations=MUTATIONS)
+    gpm.data = new.data[["genotypes", "phenotypes", "n_replicates",
+                         "stdeviations"]].copy()
+    assert ("neighbors", False) not in gpm._cache
+    assert gpm.binary_packed.shape[0] == 4
+    np.testing.assert_array_equal(gpm.codes, new.codes)
+    assert gpm.neighbors().shape == (4, 4)
+
+    # Lazy maps are not rebuilt until accessed.
+    lazy = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                                mutations=MUTATIONS, lazy=True)
+    lazy.binary_packed
+    lazy.data = new.data[["genotypes", "phenotypes"]].copy()
+    assert "binary_packed" not in lazy._cache
+    assert lazy.n_mutations.tolist() == new.n_mutations.tolist()
+
+
+def test_complete_data():
+    """Test complete and missing data views."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES[:4], [1.0, 2.0, 3.0, 4.0],
+                               mutations=MUTATIONS)
+    complete = gpm.complete_data.to_dataframe()
+    missing = gpm.missing_data.to_dataframe()
+
+    assert len(gpm.complete_data) == 8
+    assert sorted(complete.genotypes) == sorted(GENOTYPES)
+    assert complete.phenotypes.isnull().sum() == 4
+    assert sorted(missing.genotypes) == sorted(GENOTYPES[4:])
+
+
+def test_to_json_complete():
+    """Test streaming the complete data to json."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES[:4], [1.0, 2.0, 3.0, 4.0],
+                               mutations=MUTATIONS)
+
+    assert gpm.to_json(complete=True) == json.dumps(gpm.to_dict(complete=True))
+
+
+def test_subset():
+    """Test that subsets match maps built from scratch."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    index = [5, 0, 3]
+    subset = gpm.subset(index)
+    new = GenotypePhenotypeMap(WILDTYPE, gpm.genotypes[index],
+                               gpm.phenotypes[index], mutations=MUTATIONS)
+
+    assert subset.data.equals(new.data)
+    np.testing.assert_array_equal(subset.binary_packed, new.binary_packed)
+    assert subset.index_of(GENOTYPES[3]) == 2
+    assert gpm.take(gpm.n_mutations == 1).n == 3
+
+
+def test_parquet(tmpdir):
+    """Test writing and reading Parquet and Feather files."""
+    pytest.importorskip("pyarrow")
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    for ext, write, read in [
+            ("parquet", gpm.to_parquet, GenotypePhenotypeMap.read_parquet),
+            ("feather", gpm.to_feather, GenotypePhenotypeMap.read_feather)]:
+        filename = str(tmpdir / ("map." + ext))
+        write(filename)
+        new = read(filename)
+        assert new.data.equals(gpm.data)
+        assert new.mutations == gpm.mutations
+        np.testing.assert_array_equal(new.binary_packed, gpm.binary_packed)
+
+    new = GenotypePhenotypeMap.read_parquet(
+        str(tmpdir / "map.parquet"),
+        columns=["phenotypes"],
+        filters=[("n_mutations", "<=", 1)])
+    assert new.n == 4
+    assert np.all(new.n_mutations <= 1)
+
+
+def test_parquet_new_wildtype(tmpdir):
+    """Test that reading a Parquet file with a new wildtype encodes it
+    again."""
+    pytest.importorskip("pyarrow")
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    filename = str(tmpdir / "map.parquet")
+    gpm.to_parquet(filename)
+    new = GenotypePhenotypeMap.read_parquet(filename, wildtype=GENOTYPES[-1])
+    expected = GenotypePhenotypeMap(GENOTYPES[-1], GENOTYPES, np.arange(8.0),
+                                    mutations=MUTATIONS)
+
+    assert new.data.equals(expected.data)
+    np.testing.assert_array_equal(new.binary_packed, expected.binary_packed)
+
+
+def test_save_open(tmpdir):
+    """Test saving and memory-mapping a map."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    path = str(tmpdir / "map")
+    gpm.save(path)
+    new = GenotypePhenotypeMap.open(path)
+
+    # Columns are read from the arrays without building the DataFrame.
+    np.testing.assert_array_equal(new.phenotypes, gpm.phenotypes)
+    np.testing.assert_array_equal(new.genotypes, gpm.genotypes)
+    assert new.index_of(GENOTYPES[3]) == 3
+    assert new._data is None
+
+    assert new.data.equals(gpm.data)
+    assert new.encoding_table.equals(gpm.encoding_table)
+
+
+def test_read_csv_chunks(tmpdir):
+    """Test that streaming a csv file matches reading it at once."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               stdeviations=0.1, mutations=MUTATIONS)
+    filename = str(tmpdir / "map.csv")
+    gpm.to_csv(filename)
+    full = GenotypePhenotypeMap.read_csv(filename, WILDTYPE)
+
+    calls = []
+    new = GenotypePhenotypeMap.read_csv(filename, WILDTYPE, chunksize=3,
+                                        progress=lambda n, total:
+                                        calls.append((n, total)))
+    assert [n for n, total in calls] == [3, 6, 8]
+    assert calls[-1] == (8, 8)
+    assert new.data.equals(full.data)
+    assert new.mutations == full.mutations
+    np.testing.assert_array_equal(new.binary_packed, full.binary_packed)
+
+    new = GenotypePhenotypeMap.read_csv(filename, WILDTYPE, chunksize=3,
+                                        mutations=MUTATIONS)
+    assert new.data.equals(gpm.data)
+
+    with pytest.raises(KeyError):
+        GenotypePhenotypeMap.read_csv(filename, WILDTYPE, chunksize=3,
+                                      mutations={0: ["A"], 1: ["A"],
+                                                 2: ["A"]})
+
+
+def test_json_roundtrip(tmpdir):
+    """Test that the streaming json writer and reader round-trip a map."""
+    for stdeviations in [None, 0.1]:
+        gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                                   stdeviations=stdeviations,
+                                   mutations=MUTATIONS)
+        assert gpm.to_json() == json.dumps(gpm.to_dict())
+
+        filename = str(tmpdir / "map.json")
+        gpm.to_json(filename)
+        new = GenotypePhenotypeMap.read_json(filename)
+        assert new.data.equals(gpm.data)
+        assert new.mutations == gpm.mutations
+
+
+def test_pickle():
+    """Test pickling maps as arrays."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               stdeviations=0.1, mutations=MUTATIONS, foo=1)
+    new = pickle.loads(pickle.dumps(gpm, protocol=2))
+    assert new.data.equals(gpm.data)
+    assert new.metadata == {"foo": 1}
+
+
+@pytest.mark.skipif(pickle.HIGHEST_PROTOCOL < 5,
+                    reason="requires pickle protocol 5")
+def test_pickle_buffers():
+    """Test pickling maps with out-of-band buffers."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               stdeviations=0.1, mutations=MUTATIONS, foo=1)
+    buffers = []
+    data = pickle.dumps(gpm, protocol=5, buffer_callback=buffers.append)
+    new = pickle.loads(data, buffers=buffers)
+
+    assert len(buffers) > 0
+    # The DataFrame is rebuilt on first access.
+    assert new._data is None
+    np.testing.assert_array_equal(new.phenotypes, gpm.phenotypes)
+    assert new.data.equals(gpm.data)
+    assert new.metadata == {"foo": 1}
+
+
+def test_wide_map(tmpdir):
+    """Test maps whose genotype space is too large for integer codes."""
+    gpm = GenotypePhenotypeMap("0" * 64, ["0" * 64, "1" * 64])
+    assert "codes" not in gpm.data
+    assert gpm.index_of("1" * 64) == 1
+    np.testing.assert_array_equal(gpm.n_mutations, [0, 64])
+    with pytest.raises(OverflowError):
+        gpm.codes
+
+    alphabet = list("ACDEFGHIKLMNPQRSTVWY")
+    gpm = GenotypePhenotypeMap("A" * 15, ["A" * 15, "C" * 15],
+                               mutations=dict((i, alphabet)
+                                              for i in range(15)))
+    assert gpm.index_of(["C" * 15, "A" * 15]).tolist() == [1, 0]
+
+    path = str(tmpdir / "map")
+    gpm.save(path)
+    assert GenotypePhenotypeMap.open(path).data.equals(gpm.data)
+
+
+def test_pickle_object_columns():
+    """Test that object columns are pickled unchanged."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES[:4], np.arange(4.0),
+                               mutations=MUTATIONS)
+    gpm.data["flag"] = [True, None, False, True]
+    gpm.data["lists"] = [[1], [2, 3], [], None]
+    for protocol in (2, pickle.HIGHEST_PROTOCOL):
+        new = pickle.loads(pickle.dumps(gpm, protocol=protocol))
+        assert new.data.equals(gpm.data)
+        assert new.data.flag.tolist() == [True, None, False, True]
+        assert new.data["lists"].tolist() == [[1], [2, 3], [], None]
+
+
+def test_open_new_wildtype(tmpdir):
+    """Test that opening a map with a new wildtype encodes it again."""
+    gpm = GenotypePhenotypeMap(WILDTYPE, GENOTYPES, np.arange(8.0),
+                               mutations=MUTATIONS)
+    path = str(tmpdir / "map")
+    gpm.save(path)
+    new = GenotypePhenotypeMap.open(path, wildtype=GENOTYPES[-1])
+    expected = GenotypePhenotypeMap(GENOTYPES[-1], GENOTYPES, np.arange(8.0),
+                                    mutations=MUTATIONS)
+
+    assert new.wildtype == GENOTYPES[-1]
+    assert new.data.equals(expected.data)
+    assert new.encoding_table.equals(expected.encoding_table)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from gpmap import GenotypePhenotypeMap, sample
+from gpmap.simulate import MultiPeakMountFujiSimulation
+
+
+def test_sample_replicates(random_map):
+    """Test the draws per genotype and that chunking doesn't change them."""
+    gpm = random_map
+    n_replicates = np.arange(gpm.n) % 4
+    index, values = sample.sample_replicates(gpm, n_replicates=n_replicates,
+                                             seed=2)
+    np.testing.assert_array_equal(np.bincount(index, minlength=gpm.n),
+                                  n_replicates)
+    # Chunking does not change the draws.
+    _, chunked = sample.sample_replicates(gpm, n_replicates=n_replicates,
+                                          seed=2, chunksize=5)
+    np.testing.assert_array_equal(values, chunked)
+
+
+def test_sample_map(random_map):
+    """Test that sampled maps hold the mean and std of the draws."""
+    gpm = random_map
+    n_replicates = np.arange(gpm.n) % 4
+    index, values = sample.sample_replicates(gpm, n_replicates=n_replicates,
+                                             seed=2)
+    new = sample.sample_map(gpm, n_replicates=n_replicates, seed=2,
+                            chunksize=5)
+    np.testing.assert_array_equal(new.n_replicates, n_replicates)
+    for i in [1, 2, 3, 6, 7]:
+        measured = values[index == i]
+        np.testing.assert_allclose(new.phenotypes[i], measured.mean())
+        if len(measured) > 1:
+            np.testing.assert_allclose(new.stdeviations[i],
+                                       measured.std(ddof=1))
+        else:
+            assert np.isnan(new.stdeviations[i])
+    assert np.isnan(new.phenotypes[0])
+
+    # The new map is a plain map with the encoding of the original.
+    assert type(new) is GenotypePhenotypeMap
+    assert new.encoding_table is gpm.encoding_table
+    assert not np.array_equal(new.phenotypes, gpm.phenotypes)
+
+
+def test_sample_simulation(wildtype, mutations):
+    """Test that maps sampled from simulations don't share their buffers."""
+    sim = MultiPeakMountFujiSimulation(wildtype, mutations, peak_n=3, seed=1)
+    sim.set_stdeviations(0.5)
+    new = sample.sample_map(sim, n_replicates=3, seed=2)
+    phenotypes = new.phenotypes.copy()
+    sim.randomize(seed=3)
+    sim.build()
+    assert type(new) is GenotypePhenotypeMap
+    np.testing.assert_array_equal(new.phenotypes, phenotypes)
@@ -0,0 +1,209 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from gpmap import GenotypePhenotypeMap, simulate
+from gpmap.simulate import (NKSimulation, MountFujiSimulation,
+                            MultiPeakMountFujiSimulation,
+                            HouseOfCardsSimulation,
+                            WalshHadamardSimulation, StreamingNKSimulation,
+                            FisherGeometricSimulation)
+from gpmap.simulate import mask
+from gpmap.simulate.walsh import get_walsh_coefs, walsh_orders
+
+
+def test_seed(wildtype, mutations):
+    """Test that the same seed gives the same phenotypes."""
+    sim1 = NKSimulation(wildtype, mutations, K=2, seed=1)
+    sim2 = NKSimulation(wildtype, mutations, K=2, seed=1)
+    np.testing.assert_array_equal(sim1.phenotypes, sim2.phenotypes)
+
+
+def test_seed_from_length():
+    """Test that seeded maps built from a length have the same genotypes."""
+    sim1 = NKSimulation.from_length(4, K=2, seed=3, alphabet_size=3)
+    sim2 = NKSimulation.from_length(4, K=2, seed=3, alphabet_size=3)
+    assert sim1.mutations == sim2.mutations
+    np.testing.assert_array_equal(sim1.genotypes, sim2.genotypes)
+    np.testing.assert_array_equal(sim1.phenotypes, sim2.phenotypes)
+
+    kwargs = dict(length=4, alphabet_size=3, K=2)
+    phenotypes1, map1 = simulate.ensemble(NKSimulation, 2, seed=3,
+                                          return_map=True, **kwargs)
+    phenotypes2, map2 = simulate.ensemble(NKSimulation, 2, seed=3,
+                                          return_map=True, **kwargs)
+    np.testing.assert_array_equal(map1.genotypes, map2.genotypes)
+    np.testing.assert_array_equal(phenotypes1, phenotypes2)
+
+
+def _loop_nk(sim):
+    """Reference NK phenotypes, built one genotype and window at a time."""
+    table = sim.nk_table
+    neighbor = int(sim.order / 2)
+    pre_neighbor = neighbor - 1 if sim.order % 2 == 0 else neighbor
+    phenotypes = np.zeros(sim.n, dtype=float)
+    for i, binary in enumerate(sim.binary):
+        total = 0
+        for j in range(sim.length):
+            if j - pre_neighbor < 0:
+                key = binary[-pre_neighbor:] + binary[j:neighbor + j + 1]
+            elif j + neighbor > sim.length - 1:
+                key = binary[j - pre_neighbor:j + 1] + binary[0:neighbor]
+            else:
+                key = binary[j - pre_neighbor:j + neighbor + 1]
+            total += table[key]
+        phenotypes[i] = total
+    return phenotypes
+
+
+def test_nk_windows():
+    """Test that vectorized NK phenotypes match the per-genotype loop."""
+    sums = {(6, 1): 280.75878163702885, (6, 2): 245.28906056477467,
+            (7, 3): 507.0412493502422, (8, 4): 1058.6644958164147,
+            (5, 5): 79.09492649408705}
+    for (length, K), total in sums.items():
+        sim = NKSimulation.from_length(length, K=K, seed=1)
+        np.testing.assert_array_equal(sim.phenotypes, _loop_nk(sim))
+        np.testing.assert_allclose(sim.phenotypes.sum(), total, rtol=1e-12)
+
+
+def test_house_of_cards(wildtype, mutations):
+    """Test that House of Cards draws one seeded value per genotype."""
+    sim1 = HouseOfCardsSimulation(wildtype, mutations, seed=2)
+    sim2 = HouseOfCardsSimulation(wildtype, mutations, seed=2)
+    np.testing.assert_array_equal(sim1.phenotypes, sim2.phenotypes)
+    np.testing.assert_array_equal(sim1.phenotypes, sim1.values[sim1.codes])
+    assert len(np.unique(sim1.phenotypes)) == sim1.n
+
+    sim3 = HouseOfCardsSimulation(wildtype, mutations, seed=3)
+    assert not np.array_equal(sim1.phenotypes, sim3.phenotypes)
+
+    with pytest.raises(Exception):
+        sim1.set_order(2)
+
+
+def test_mount_fuji_fields(wildtype, mutations):
+    """Test the cached distance fields and the scale of Mount Fuji maps."""
+    sim = MultiPeakMountFujiSimulation(wildtype, mutations, peak_n=3,
+                                       seed=1)
+    hamming_min = sim.hamming_min
+    assert sim.hamming_min is hamming_min
+    np.testing.assert_array_equal(hamming_min, sim.hamming.min(axis=0))
+    np.testing.assert_array_equal(sim.hamming_max, sim.hamming.max(axis=0))
+
+    # scale returns a copy that later builds don't change.
+    scale = sim.scale
+    np.testing.assert_array_equal(scale, 1 - hamming_min / hamming_min.max())
+    sim.peaks = [wildtype]
+    np.testing.assert_array_equal(scale, 1 - hamming_min / hamming_min.max())
+    sim.scale[:] = 0
+    np.testing.assert_array_equal(sim.phenotypes, sim.scale)
+
+    # Setting peaks cleared the fields.
+    np.testing.assert_array_equal(sim.hamming_min, sim.n_mutations)
+
+
+def test_mount_fuji_peaks(wildtype, mutations):
+    """Test that peaks are placed within min_dist/max_dist of each other."""
+    sim = MultiPeakMountFujiSimulation(wildtype, mutations, peak_n=4,
+                                       min_dist=2, seed=1)
+    distances = sim.hamming[:, sim.index_of(sim.peaks)]
+    assert len(sim.peaks) == 4
+    assert np.all(distances[~np.eye(4, dtype=bool)] >= 2)
+
+    # No genotype is 4 mutations away from both AAAAAA and BBBBBB.
+    with pytest.raises(Exception):
+        MultiPeakMountFujiSimulation(wildtype, mutations, peak_n=3,
+                                     min_dist=4, seed=1)
+
+
+def test_ensemble(wildtype, mutations):
+    """Test that ensembles are seeded the same in serial and parallel."""
+    kwargs = dict(wildtype=wildtype, mutations=mutations, peak_n=3,
+                  roughness_width=0.1)
+    serial = simulate.ensemble(MultiPeakMountFujiSimulation, 6, seed=3,
+                               **kwargs)
+    parallel = simulate.ensemble(MultiPeakMountFujiSimulation, 6, seed=3,
+                                 n_jobs=2, **kwargs)
+    assert serial.shape == (6, 2**6)
+    np.testing.assert_array_equal(serial, parallel)
+    assert len(np.unique(serial[:, 0])) == 6
+
+
+def test_walsh_hadamard(wildtype, mutations):
+    """Test Walsh-Hadamard phenotypes against an explicit design matrix."""
+    sim = WalshHadamardSimulation(wildtype, mutations, widths=[1, 0.5],
+                                  seed=2)
+    # Phenotypes from an explicit design matrix of +1/-1 site states.
+    x = 1 - 2 * sim.binary_matrix.astype(float)
+    n_sites = x.shape[1]
+    design = np.ones((sim.n, 2**n_sites))
+    for index in range(2**n_sites):
+        for i in range(n_sites):
+            if (index >> (n_sites - 1 - i)) & 1:
+                design[:, index] *= x[:, i]
+    np.testing.assert_allclose(design @ sim.coefs, sim.phenotypes)
+    assert np.all(sim.coefs[walsh_orders(n_sites) > 2] == 0)
+    np.testing.assert_allclose(get_walsh_coefs(sim), sim.coefs, atol=1e-12)
+
+
+def test_streaming_nk(wildtype, mutations, tmpdir):
+    """Test that streamed NK phenotypes match the in-memory NK map."""
+    sim = NKSimulation(wildtype, mutations, K=3, seed=4)
+    stream = StreamingNKSimulation(wildtype, mutations, K=3, seed=4,
+                                   chunksize=7,
+                                   filename=str(tmpdir / "nk.npy"))
+    np.testing.assert_array_equal(stream.phenotypes, sim.phenotypes)
+    np.testing.assert_array_equal(np.load(str(tmpdir / "nk.npy")),
+                                  sim.phenotypes)
+    assert stream.query("ABABAB") == sim.phenotypes[sim.index_of("ABABAB")]
+    sample = stream.sample(10, seed=1)
+    np.testing.assert_array_equal(sample.phenotypes,
+                                  sim.phenotypes[sample.codes])
+
+
+def test_fisher_geometric(wildtype, mutations):
+    """Test Fisher's geometric phenotypes against the effects."""
+    sim = FisherGeometricSimulation(wildtype, mutations, n_traits=3, seed=1)
+    index = sim.index_of("ABAABB")
+    z = sim.wildtype_position + sim.binary_matrix[index] @ sim.effects
+    np.testing.assert_allclose(sim.phenotypes[index], np.exp(-z @ z / 2))
+    np.testing.assert_allclose(sim.phenotypes[0], np.exp(-0.5))
+
+
+def test_pickle(wildtype, mutations):
+    """Test that simulations pickle with their class and tables."""
+    sim = NKSimulation(wildtype, mutations, K=2, seed=1)
+    for protocol in (2, pickle.HIGHEST_PROTOCOL):
+        new = pickle.loads(pickle.dumps(sim, protocol=protocol))
+        assert isinstance(new, NKSimulation)
+        assert new.data.equals(sim.data)
+        np.testing.assert_array_equal(new.keys, sim.keys)
+        np.testing.assert_array_equal(new.values, sim.values)
+
+
+def test_subset(wildtype, mutations):
+    """Test that subsets of simulations are plain maps, independent of the
+    simulation they came from."""
+    fuji = MultiPeakMountFujiSimulation(wildtype, mutations, peak_n=3,
+                                        seed=1)
+    walsh = WalshHadamardSimulation(wildtype, mutations, widths=[1, 0.5],
+                                    seed=2)
+    for sim in (fuji, walsh):
+        keep = sim.n_mutations <= 1
+        subset = sim.subset(keep)
+        assert type(subset) is GenotypePhenotypeMap
+        phenotypes = sim.phenotypes[keep]
+        np.testing.assert_array_equal(subset.phenotypes, phenotypes)
+
+        # The simulation still builds, and the subset doesn't change.
+        sim.randomize(seed=5)
+        sim.build()
+        np.testing.assert_array_equal(subset.phenotypes, phenotypes)
+    fuji.field_strength = 2
+
+    _, masked = mask.mask(MountFujiSimulation(wildtype, mutations),
+                                 0.5, seed=1)
+    assert type(masked) is GenotypePhenotypeMap
+    assert masked.n == 32
@@ -0,0 +1,37 @@
+import numpy as np
+
+from .. import utils
+from ..space import GenotypeSpace
+from .test_utils import WILDTYPE, MUTATIONS
+
+
+def test_genotype_at():
+    """Test that the space matches the enumerated genotypes."""
+    space = GenotypeSpace(WILDTYPE, MUTATIONS)
+    genotypes = utils.mutations_to_genotypes(MUTATIONS, wildtype=WILDTYPE)
+
+    assert len(space) == len(genotypes)
+    assert space[:].tolist() == genotypes
+    assert space[-1] == genotypes[-1]
+    assert list(space) == genotypes
+
+
+def test_index_of():
+    """Test index_of inverts genotype_at."""
+    space = GenotypeSpace(WILDTYPE, MUTATIONS)
+    indices = np.array([7, 0, 3])
+
+    np.testing.assert_array_equal(
+        space.index_of(space.genotype_at(indices)), indices)
+    assert "ABA" in space
+    assert "ACA" not in space
+
+
+def test_large_space():
+    """Test random access into a space too large to enumerate."""
+    mutations = utils.length_to_mutations(40, alphabet=["A", "B"])
+    space = GenotypeSpace("A" * 40, mutations)
+    genotypes, indices = space.sample(10, seed=1, return_indices=True)
+
+    assert len(space) == 2**40
+    np.testing.assert_array_equal(space.index_of(genotypes), indices)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from gpmap import split
+
+
+def test_stratified_split(random_map):
+    """Test that test sets are stratified by the number of mutations."""
+    gpm = random_map
+    for train, test in split.stratified_split(gpm, 0.5, n_splits=3, seed=1):
+        assert len(np.intersect1d(train, test)) == 0
+        assert len(train) + len(test) == gpm.n
+        np.testing.assert_array_equal(
+            np.bincount(gpm.n_mutations[test], minlength=7),
+            [0, 3, 8, 10, 8, 3, 0])
+
+
+def test_kfold(random_map):
+    """Test that every genotype is in one test fold per repeat."""
+    gpm = random_map
+    counts = np.zeros(gpm.n, dtype=int)
+    for train, test in split.kfold(gpm, n_folds=5, n_repeats=2, seed=1):
+        assert len(np.intersect1d(train, test)) == 0
+        counts[test] += 1
+    assert np.all(counts == 2)
+
+    train, test = next(split.kfold(gpm, n_folds=4, seed=1, return_maps=True))
+    assert (train.n, test.n) == (48, 16)
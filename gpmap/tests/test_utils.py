@@ -1,3 +1,5 @@
+import numpy as np
+
 # Import utils model.
 from .. import utils
 
@@ -126,3 +128,77 @@ def test_get_missing_genotypes():
     missing = utils.get_missing_genotypes(known_, MUTATIONS)
 
     assert lists_are_same(missing, missing_)
+
+
+def test_genotypes_to_array():
+    """Test genotypes to array function."""
+    array = utils.genotypes_to_array(GENOTYPES)
+
+    assert array.shape == (8, 3)
+    assert array[7].tolist() == [ord("B")] * 3
+
+
+def test_genotypes_to_binary_multiallelic():
+    """Test genotypes_to_binary against a per-site lookup on a multi-allelic
+    space."""
+    mutations = {0: ["A", "B", "C"], 1: ["A", "B"], 2: ["C", "A", "B"]}
+    genotypes = utils.mutations_to_genotypes(mutations, wildtype=WILDTYPE)
+    encoding = utils.mutations_to_encoding(WILDTYPE, mutations)
+    expected = ["".join(encoding[i][s] for i, s in enumerate(g))
+                for g in genotypes]
+
+    encoding_table = utils.get_encoding_table(WILDTYPE, mutations)
+    binary = utils.genotypes_to_binary(genotypes, encoding_table)
+
+    assert binary == expected
+
+
+def test_count_bits():
+    """Test count bits on a packed binary representation."""
+    binary = np.array([[int(b) for b in s] for s in BINARY], dtype=np.uint8)
+    packed = np.packbits(binary, axis=1)
+
+    assert utils.count_bits(packed, axis=1).tolist() == [
+        s.count("1") for s in BINARY]
+    assert utils.binary_to_strings(binary) == BINARY
+
+
+def test_genotypes_to_codes():
+    """Test genotypes to codes function."""
+    mutations = {0: ["A", "B", "C"], 1: ["A", "B"], 2: ["C", "A", "B"]}
+    genotypes = utils.mutations_to_genotypes(mutations, wildtype=WILDTYPE)
+    codes = utils.genotypes_to_codes(genotypes, mutations)
+
+    assert codes.tolist() == list(range(len(genotypes)))
+
+
+def test_codes_to_genotypes():
+    """Test codes to genotypes function."""
+    codes = utils.genotypes_to_codes(GENOTYPES, MUTATIONS)
+    genotypes = utils.codes_to_genotypes(codes, MUTATIONS)
+
+    assert genotypes.tolist() == GENOTYPES
+
+
+def test_get_neighbors():
+    """Test get_neighbors against pairwise hamming distances."""
+    codes = utils.genotypes_to_codes(GENOTYPES, MUTATIONS)
+    neighbors = utils.get_neighbors(codes, MUTATIONS).toarray()
+
+    for i, g1 in enumerate(GENOTYPES):
+        for j, g2 in enumerate(GENOTYPES):
+            expected = utils.hamming_distance(g1, g2) == 1
+            assert bool(neighbors[i, j]) == expected
+
+
+def test_get_missing_genotypes_lazy():
+    """Test get_missing_genotypes returning codes and iterators."""
+    known_, missing_ = GENOTYPES[0:4], GENOTYPES[4:]
+
+    codes = utils.get_missing_genotypes(known_, MUTATIONS, return_codes=True)
+    missing = utils.get_missing_genotypes(known_, MUTATIONS, lazy=True,
+                                          chunksize=3)
+
+    assert lists_are_same(utils.codes_to_genotypes(codes, MUTATIONS),
+                          missing_)
+    assert lists_are_same(list(missing), missing_)
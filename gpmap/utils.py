@@ -22,6 +22,7 @@ encoding : dict
 import itertools as it
 import numpy as np
 from scipy.special import comb
+from scipy.sparse import csr_matrix
 from collections import OrderedDict
 import warnings
 import pandas as pd
@@ -87,9 +88,12 @@ def hamming_distance(s1, s2):
 def sample_phenotypes(phenotypes, errors, n=1):
     """Generate `n` phenotypes from from normal distributions. """
     samples = np.random.randn(len(phenotypes), n)
-    # Apply phenotype scale and variance
-    for i in range(n):
-        samples[:, i] = np.multiply(samples[:, i], errors) + phenotypes
+    # Apply phenotype scale and variance to all columns at once.
+    errors = np.asarray(errors)
+    if errors.ndim > 0:
+        errors = errors[:, None]
+    samples *= errors
+    samples += np.asarray(phenotypes)[:, None]
     return samples
 
 # -------------------------------------------------------
@@ -108,13 +112,12 @@ def find_differences(s1, s2):
 
 def farthest_genotype(reference, genotypes):
     """Find the genotype in the system that differs at the most sites. """
-    mutations = 0
-    for genotype in genotypes:
-        differs = hamming_distance(genotype, reference)
-        if differs > mutations:
-            mutations = int(differs)
-            mutant = str(genotype)
-    return mutant
+    array = genotypes_to_array(genotypes)
+    differs = np.count_nonzero(array != genotypes_to_array([reference]),
+                               axis=1)
+    if len(differs) == 0 or differs.max() == 0:
+        raise Exception("No genotype differs from the reference.")
+    return str(np.asarray(genotypes)[differs.argmax()])
 
 # -------------------------------------------------------
 # Space enumerations
@@ -214,6 +217,152 @@ def get_encoding_table(wildtype, mutations, site_labels=None):
     return df
 
 
+def genotypes_to_array(genotypes):
+    """Convert a list of equal-length genotypes into a 2d array of character
+    codes (one row per genotype, one column per site).
+
+    The strings are viewed as a fixed-width unicode array, so no Python-level
+    loop over the characters is needed.
+
+    Parameters
+    ----------
+    genotypes : array-like
+        List of the genotypes to convert.
+
+    Returns
+    -------
+    array : numpy.ndarray
+        (n_genotypes, length) array of unicode code points (uint32).
+    """
+    genotypes = np.asarray(genotypes)
+    if genotypes.dtype.kind != 'U':
+        genotypes = genotypes.astype(str)
+    genotypes = genotypes.ravel()
+
+    # Empty list of genotypes.
+    if len(genotypes) == 0:
+        return np.empty((0, 0), dtype=np.uint32)
+
+    # Check genotypes are all same length
+    length_of_genotypes = np.char.str_len(genotypes)
+    length = int(length_of_genotypes[0])
+    if np.any(length_of_genotypes != length):
+        raise Exception("Genotypes are not all the same length.")
+
+    # Force the itemsize to match the genotype length and view the raw
+    # code points.
+    genotypes = genotypes.astype('U{}'.format(max(length, 1)))
+    array = genotypes.view(np.uint32).reshape(len(genotypes), -1)
+    return array[:, :length]
+
+
+def get_encoding_lookup(encoding_table, n_chars=128):
+    """Build a table-driven lookup from an encoding table (see
+    `get_encoding_table`) for use with `array_to_binary`.
+
+    Parameters
+    ----------
+    encoding_table : pandas.DataFrame
+        DataFrame that encodes the binary representation of each mutation.
+    n_chars : int
+        Minimum number of character codes to include in the lookup.
+
+    Returns
+    -------
+    lookup : numpy.ndarray
+        (length, n_chars) integer array. ``lookup[site, ord(letter)]`` is the
+        column of the binary representation that is set by `letter` at
+        `site`, -1 if the letter sets no bit (i.e. the wildtype letter), and
+        -2 if the letter is not in the site's alphabet.
+    width : int
+        Number of columns in the binary representation.
+    """
+    t = encoding_table
+    letters = [letter for letter in t.mutation_letter
+               if isinstance(letter, str)]
+    letters += list(t.wildtype_letter)
+    n_chars = max([n_chars] + [ord(letter) + 1 for letter in letters])
+    length = int(t.genotype_index.max()) + 1
+
+    lookup = np.full((length, n_chars), -2, dtype=np.int64)
+    width = 0
+    for row in t.itertuples():
+        site = int(row.genotype_index)
+        start = int(row.binary_index_start)
+
+        # Sites that don't mutate only accept the wildtype letter.
+        if not isinstance(row.mutation_letter, str):
+            lookup[site, ord(row.wildtype_letter)] = -1
+            continue
+
+        bit = row.binary_repr.find('1')
+        if bit < 0:
+            lookup[site, ord(row.mutation_letter)] = -1
+        else:
+            lookup[site, ord(row.mutation_letter)] = start + bit
+        width = max(width, start + len(row.binary_repr))
+    return lookup, width
+
+
+def array_to_binary(array, encoding_table):
+    """Build a binary representation of a 2d array of character codes (see
+    `genotypes_to_array`) using an encoding table.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        (n_genotypes, length) array of character codes.
+    encoding_table : pandas.DataFrame
+        DataFrame that encodes the binary representation of each mutation.
+
+    Returns
+    -------
+    binary : numpy.ndarray
+        (n_genotypes, width) array of 0s and 1s (uint8).
+    """
+    n_chars = int(array.max()) + 1 if array.size else 0
+    lookup, width = get_encoding_lookup(encoding_table, n_chars=n_chars)
+
+    n, length = array.shape
+    if length != lookup.shape[0] and n > 0:
+        raise Exception("Genotypes are not the same length as the encoding "
+                        "table.")
+
+    # Single gather: column index of the bit set by each site.
+    columns = lookup[np.arange(length), array]
+    if np.any(columns == -2):
+        row, site = np.argwhere(columns == -2)[0]
+        raise KeyError((int(site), chr(array[row, site])))
+
+    binary = np.zeros((n, width), dtype=np.uint8)
+    rows, sites = np.nonzero(columns >= 0)
+    binary[rows, columns[rows, sites]] = 1
+    return binary
+
+
+def binary_to_strings(binary):
+    """Convert a 2d array of 0s and 1s into a list of binary strings."""
+    binary = np.asarray(binary, dtype=np.uint8)
+    n, width = binary.shape
+    if width == 0:
+        return ["" for i in range(n)]
+    chars = np.ascontiguousarray(binary + ord('0'))
+    return chars.view('S{}'.format(width)).ravel().astype(str).tolist()
+
+
+# Number of set bits in every possible byte.
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)],
+                          dtype=np.uint8)
+
+
+def count_bits(packed, axis=-1):
+    """Count the number of set bits in a packed (see `numpy.packbits`) uint8
+    array along the given axis.
+    """
+    packed = np.asarray(packed, dtype=np.uint8)
+    return POPCOUNT_TABLE[packed].sum(axis=axis, dtype=np.int64)
+
+
 def genotypes_to_binary(genotypes, encoding_table):
     """Using an encoding table (see `get_encoding_table`
     function), build a set of binary genotypes.
@@ -227,25 +376,300 @@ def genotypes_to_binary(genotypes, encoding_table):
         each mutation in the list of genotypes. (See the
         `get_encoding_table`).
     """
-    # ---------- Sanity Checks ---------------
-    # 1. Check genotypes are all same length
-    length_of_genotypes = [len(g) for g in genotypes]
-    length = length_of_genotypes[0]
+    array = genotypes_to_array(genotypes)
+    binary = array_to_binary(array, encoding_table)
+    return binary_to_strings(binary)
 
-    if len(set(length_of_genotypes)) > 1:
-        raise Exception("Genotypes are not all the same length.")
 
-    binary = []
-    # Alias for encoding table
-    t = encoding_table
-    mapper = dict(zip(zip(t.genotype_index, t.mutation_letter), t.binary_repr))
-    for g in genotypes:
-        b = []
-        for genotype_index, mutation_letter in enumerate(g):
-            chunk = mapper[(genotype_index, mutation_letter)]
-            b.append(chunk)
-        binary.append("".join(b))
-    return binary
+# -------------------------------------------------------
+# Mixed-radix integer codes
+# -------------------------------------------------------
+
+
+def mutations_to_alphabets(mutations, wildtype=None):
+    """List the alphabet at each site of a mutations dictionary. Sites that
+    don't mutate have the wildtype letter as their only letter.
+    """
+    alphabets = []
+    for i, val in enumerate(mutations.values()):
+        if val is None:
+            alphabets.append([wildtype[i]])
+        else:
+            alphabets.append(list(val))
+    return alphabets
+
+
+def get_code_radices(mutations, wildtype=None):
+    """Get the radix (alphabet size) and the place value of every site in the
+    mixed-radix integer code of a genotype.
+
+    The first site is the most significant digit, so codes count genotypes in
+    the same order as `mutations_to_genotypes`.
+
+    Returns
+    -------
+    radices : numpy.ndarray
+        alphabet size at each site.
+    weights : numpy.ndarray
+        place value of each site.
+    size : int
+        number of genotypes in the space.
+    """
+    alphabets = mutations_to_alphabets(mutations, wildtype=wildtype)
+    radices = [len(alphabet) for alphabet in alphabets]
+
+    weights = []
+    size = 1
+    for radix in radices[::-1]:
+        weights.append(size)
+        size *= radix
+    if size > np.iinfo(np.int64).max:
+        raise OverflowError("The genotype space is too large to be encoded "
+                            "as 64-bit integers.")
+    radices = np.array(radices, dtype=np.int64)
+    weights = np.array(weights[::-1], dtype=np.int64)
+    return radices, weights, size
+
+
+def codes_fit(mutations, wildtype=None):
+    """Whether every genotype of the space can be given a 64-bit integer
+    code (see `get_code_radices`)."""
+    size = 1
+    for alphabet in mutations_to_alphabets(mutations, wildtype=wildtype):
+        size *= len(alphabet)
+    return size <= np.iinfo(np.int64).max
+
+
+def encoding_overridden(header, overrides):
+    """Whether overrides of a stored map's header (e.g. keyword arguments
+    to `GenotypePhenotypeMap.open`) change how its genotypes are encoded, so
+    stored binary representations and codes can't be reused.
+
+    Parameters
+    ----------
+    header : dict
+        stored wildtype, mutations and site_labels.
+    overrides : dict
+        new values for any of them.
+    """
+    for key in ("wildtype", "mutations", "site_labels"):
+        if key not in overrides:
+            continue
+        old, new = header.get(key), overrides[key]
+        if key == "mutations" and old is not None and new is not None:
+            # Keys may be strings (json) or integers.
+            old = dict((int(k), list(v)) for k, v in old.items())
+            new = dict((int(k), list(v)) for k, v in new.items())
+        elif key == "site_labels" and old is not None and new is not None:
+            old, new = list(old), list(new)
+        if old != new:
+            return True
+    return False
+
+
+def get_code_lookup(mutations, wildtype=None, n_chars=128):
+    """Build a table-driven lookup for converting character codes (see
+    `genotypes_to_array`) into the digits of mixed-radix integer codes.
+
+    Returns
+    -------
+    lookup : numpy.ndarray
+        (length, n_chars) array. ``lookup[site, ord(letter)]`` is the position
+        of `letter` in the alphabet of `site`, or -1 if it is not in the
+        alphabet.
+    """
+    alphabets = mutations_to_alphabets(mutations, wildtype=wildtype)
+    letters = [letter for alphabet in alphabets for letter in alphabet]
+    n_chars = max([n_chars] + [ord(letter) + 1 for letter in letters])
+
+    lookup = np.full((len(alphabets), n_chars), -1, dtype=np.int64)
+    for site, alphabet in enumerate(alphabets):
+        for digit, letter in enumerate(alphabet):
+            lookup[site, ord(letter)] = digit
+    return lookup
+
+
+def array_to_codes(array, mutations, wildtype=None):
+    """Convert a 2d array of character codes (see `genotypes_to_array`) into
+    mixed-radix integer codes.
+    """
+    n_chars = int(array.max()) + 1 if array.size else 0
+    lookup = get_code_lookup(mutations, wildtype=wildtype, n_chars=n_chars)
+    radices, weights, size = get_code_radices(mutations, wildtype=wildtype)
+
+    n, length = array.shape
+    if length != len(radices) and n > 0:
+        raise Exception("Genotypes are not the same length as the mutations "
+                        "dictionary.")
+
+    digits = lookup[np.arange(length), array]
+    if np.any(digits < 0):
+        row, site = np.argwhere(digits < 0)[0]
+        raise KeyError((int(site), chr(array[row, site])))
+
+    # Horner's scheme over the sites keeps memory at one row of codes.
+    codes = np.zeros(n, dtype=np.int64)
+    for site in range(length):
+        codes *= radices[site]
+        codes += digits[:, site]
+    return codes
+
+
+def genotypes_to_codes(genotypes, mutations, wildtype=None):
+    """Convert a list of genotypes into mixed-radix integer codes. The code of
+    a genotype is its position in the list returned by
+    `mutations_to_genotypes`.
+
+    Parameters
+    ----------
+    genotypes : array-like
+        List of genotypes to encode.
+    mutations : dict
+        Mapping dict with site numbers as keys and lists of mutations as
+        values.
+    wildtype : str
+        wildtype genotype; only needed for sites that don't mutate.
+
+    Returns
+    -------
+    codes : numpy.ndarray
+        integer code of each genotype (int64).
+    """
+    array = genotypes_to_array(genotypes)
+    return array_to_codes(array, mutations, wildtype=wildtype)
+
+
+def codes_to_array(codes, mutations, wildtype=None):
+    """Convert mixed-radix integer codes into a 2d array of character codes.
+    """
+    alphabets = mutations_to_alphabets(mutations, wildtype=wildtype)
+    radices, weights, size = get_code_radices(mutations, wildtype=wildtype)
+
+    codes = np.array(codes, dtype=np.int64).ravel()
+    if np.any(codes < 0) or np.any(codes >= size):
+        raise IndexError("Genotype codes must be between 0 and {}.".format(
+            size - 1))
+
+    array = np.empty((len(codes), len(alphabets)), dtype=np.uint32)
+    for site in range(len(alphabets) - 1, -1, -1):
+        chars = np.array([ord(letter) for letter in alphabets[site]],
+                         dtype=np.uint32)
+        codes, digits = np.divmod(codes, radices[site])
+        array[:, site] = chars[digits]
+    return array
+
+
+def array_to_genotypes(array):
+    """Convert a 2d array of character codes into an array of genotypes."""
+    array = np.ascontiguousarray(array, dtype=np.uint32)
+    n, length = array.shape
+    if length == 0:
+        return np.array(["" for i in range(n)])
+    return array.view('U{}'.format(length)).ravel()
+
+
+def codes_to_genotypes(codes, mutations, wildtype=None):
+    """Convert mixed-radix integer codes (see `genotypes_to_codes`) into
+    genotypes.
+
+    Returns
+    -------
+    genotypes : numpy.ndarray
+        array of genotypes (strings).
+    """
+    array = codes_to_array(codes, mutations, wildtype=wildtype)
+    return array_to_genotypes(array)
+
+
+def get_mutation_labels(encoding_table, mutations, wildtype=None):
+    """Map every letter at every site to the `mutation_index` it has in an
+    encoding table (see `get_encoding_table`).
+
+    Returns
+    -------
+    labels : list of numpy.ndarray
+        ``labels[site][digit]`` is the mutation index of the letter at
+        position `digit` in the alphabet of `site`, or 0 for the wildtype
+        letter.
+    """
+    alphabets = mutations_to_alphabets(mutations, wildtype=wildtype)
+    t = encoding_table[encoding_table.mutation_index.notna()]
+    lookup = dict(zip(zip(t.genotype_index, t.mutation_letter),
+                      t.mutation_index))
+
+    labels = []
+    for site, alphabet in enumerate(alphabets):
+        labels.append(np.array([lookup.get((site, letter), 0)
+                                for letter in alphabet], dtype=np.int64))
+    return labels
+
+
+def get_neighbors(codes, mutations, wildtype=None, encoding_table=None):
+    """Build the sparse adjacency matrix of genotypes that differ by a single
+    mutation.
+
+    The neighbors of every genotype are found by changing one digit of its
+    integer code (see `genotypes_to_codes`) at a time and looking the result
+    up in a hash index, which takes O(n * length * alphabet size) time for
+    any alphabet.
+
+    Parameters
+    ----------
+    codes : array-like
+        integer codes of the genotypes.
+    mutations : dict
+        Mapping dict with site numbers as keys and lists of mutations as
+        values.
+    wildtype : str
+        wildtype genotype; only needed for sites that don't mutate.
+    encoding_table : pandas.DataFrame (optional)
+        If given, every edge is labelled with the `mutation_index` of the
+        mutation that connects the two genotypes: the mutation carried by the
+        neighbor, or the genotype's own mutation if the neighbor carries the
+        wildtype letter.
+
+    Returns
+    -------
+    neighbors : scipy.sparse.csr_matrix
+        (n, n) adjacency matrix. Entries are 1 (or the mutation index) for
+        neighboring genotypes.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    radices, weights, size = get_code_radices(mutations, wildtype=wildtype)
+    if encoding_table is not None:
+        labels = get_mutation_labels(encoding_table, mutations,
+                                     wildtype=wildtype)
+
+    index = pd.Index(codes)
+    positions = np.arange(len(codes))
+    rows, cols, data = [], [], []
+    for site, radix in enumerate(radices):
+        digits = (codes // weights[site]) % radix
+        for shift in range(1, radix):
+            # Change the digit at this site to every other letter.
+            other = (digits + shift) % radix
+            mutated = codes + (other - digits) * weights[site]
+            neighbor = index.get_indexer(mutated)
+            found = neighbor >= 0
+            rows.append(positions[found])
+            cols.append(neighbor[found])
+
+            if encoding_table is not None:
+                label = labels[site][other[found]]
+                own = labels[site][digits[found]]
+                data.append(np.where(label > 0, label, own))
+
+    if len(rows) > 0:
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+    else:
+        rows = cols = np.empty(0, dtype=np.int64)
+
+    if encoding_table is not None and len(data) > 0:
+        data = np.concatenate(data)
+    else:
+        data = np.ones(len(rows), dtype=np.int64)
+
+    return csr_matrix((data, (rows, cols)), shape=(len(codes), len(codes)))
 
 
 def mutations_to_encoding(wildtype, mutations):
@@ -316,16 +740,11 @@ def mutations_to_genotypes(mutations, wildtype=None):
     genotypes : list
         list of genotypes comprised of mutations in given dictionary.
     """
-    # Convert mutations dict to list of lists
-    mutations_ = []
-    for i, val in enumerate(mutations.values()):
-        if val is None:
-            mutations_.append(wildtype[i])
-        else:
-            mutations_.append(val)
-    sequences = it.product(*mutations_)
-    genotypes = ["".join(s) for s in sequences]
-    return genotypes
+    # Decode every integer code in the space.
+    radices, weights, size = get_code_radices(mutations, wildtype=wildtype)
+    codes = np.arange(size, dtype=np.int64)
+    genotypes = codes_to_genotypes(codes, mutations, wildtype=wildtype)
+    return genotypes.tolist()
 
 
 def genotypes_to_mutations(genotypes):
@@ -344,9 +763,90 @@ def genotypes_to_mutations(genotypes):
     return mutations
 
 
-def get_missing_genotypes(genotypes, mutations=None):
+# Default number of codes scanned at a time when searching for missing
+# genotypes.
+MISSING_CHUNKSIZE = 2**20
+
+
+def iter_missing_codes(codes, size, chunksize=MISSING_CHUNKSIZE):
+    """Iterate over the integer codes in ``range(size)`` that are not in
+    `codes`.
+
+    The code range is scanned in chunks, so memory is bounded by `chunksize`
+    plus a sorted copy of `codes`.
+
+    Yields
+    ------
+    missing : numpy.ndarray
+        sorted array of missing codes in each chunk.
+    """
+    codes = np.unique(np.asarray(codes, dtype=np.int64))
+    for start in range(0, size, chunksize):
+        stop = min(start + chunksize, size)
+        # Bitmap of the chunk; clear the codes that are observed.
+        missing = np.ones(stop - start, dtype=bool)
+        lo, hi = np.searchsorted(codes, [start, stop])
+        missing[codes[lo:hi] - start] = False
+        yield np.flatnonzero(missing) + start
+
+
+def missing_genotypes_from_codes(codes, mutations, wildtype=None,
+                                 return_codes=False, lazy=False,
+                                 chunksize=MISSING_CHUNKSIZE):
+    """Get the genotypes in the space given by a mutations dictionary whose
+    integer codes (see `genotypes_to_codes`) are not in `codes`.
+
+    Parameters
+    ----------
+    codes : array-like
+        integer codes of the observed genotypes.
+    mutations : dict
+        Mutation dictionary.
+    wildtype : str
+        wildtype genotype; only needed for sites that don't mutate.
+    return_codes : bool (default=False)
+        Return integer codes instead of genotypes.
+    lazy : bool (default=False)
+        Return an iterator that decodes the missing genotypes chunk by chunk.
+    chunksize : int
+        number of codes scanned at a time.
+
+    Return
+    ------
+    missing_genotypes : list, numpy.ndarray or iterator
+        missing genotypes (list) or codes (numpy.ndarray), sorted by code.
+    """
+    radices, weights, size = get_code_radices(mutations, wildtype=wildtype)
+    chunks = iter_missing_codes(codes, size, chunksize=chunksize)
+
+    def iterate():
+        for chunk in chunks:
+            if return_codes:
+                for code in chunk:
+                    yield int(code)
+            else:
+                for genotype in codes_to_genotypes(chunk, mutations,
+                                                   wildtype=wildtype):
+                    yield str(genotype)
+
+    if lazy:
+        return iterate()
+
+    missing = list(chunks)
+    if return_codes:
+        return np.concatenate([np.empty(0, dtype=np.int64)] + missing)
+    return [str(genotype) for chunk in missing
+            for genotype in codes_to_genotypes(chunk, mutations,
+                                               wildtype=wildtype)]
+
+
+def get_missing_genotypes(genotypes, mutations=None, return_codes=False,
+                          lazy=False, chunksize=MISSING_CHUNKSIZE):
     """Get a list of genotypes not found in the given genotypes list.
 
+    Genotypes are compared as integer codes, so the complete genotype space is
+    never enumerated (see `missing_genotypes_from_codes`).
+
     Parameters
     ----------
     genotypes : list
@@ -355,6 +855,12 @@ def get_missing_genotypes(genotypes, mutations=None):
     mutations : dict (optional)
         Mutation dictionary
 
+    return_codes : bool (default=False)
+        Return integer codes instead of genotypes.
+
+    lazy : bool (default=False)
+        Return an iterator that decodes the missing genotypes chunk by chunk.
+
     Return
     ------
     missing_genotypes : list
@@ -366,12 +872,16 @@ def get_missing_genotypes(genotypes, mutations=None):
     # Need a wildtype--doesn't matter what it is.
     wildtype = "".join([sites[0] for sites in mutations.values()])
 
-    # Get all genotypes.
-    all_genotypes = mutations_to_genotypes(mutations, wildtype)
-
     # Find genotypes not found in genotypes list.
-    missing_genotypes = set(all_genotypes).difference(set(genotypes))
-    return list(missing_genotypes)
+    codes = genotypes_to_codes(genotypes, mutations, wildtype=wildtype)
+    return missing_genotypes_from_codes(
+        codes,
+        mutations,
+        wildtype=wildtype,
+        return_codes=return_codes,
+        lazy=lazy,
+        chunksize=chunksize
+    )
 
 def length_to_mutations(length, alphabet=["0", "1"]):
     """Build a mutations dictionary for a given alphabet
@@ -0,0 +1,183 @@
+# Lazy views of a GenotypePhenotypeMap over its complete genotype space
+#
+# ----------------------------------------------------------
+# Outside imports
+# ----------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------------------------
+# Local imports
+# ----------------------------------------------------------
+
+import gpmap.utils as utils
+
+
+class BaseDataView(object):
+    """Object to attach to GenotypePhenotypeMap objects for viewing data over
+    (part of) the complete genotype space without materializing it.
+
+    Rows are generated in chunks of integer codes (see
+    `utils.genotypes_to_codes`), so only one chunk of genotypes is held as
+    Python objects at a time.
+    """
+    chunksize = 2**16
+
+    def __init__(self, Map):
+        self._Map = Map
+
+    def __len__(self):
+        raise Exception(""" Must be implemented in a subclass """)
+
+    def _iter_codes(self, chunksize):
+        """Iterate over chunks of integer codes in the view."""
+        raise Exception(""" Must be implemented in a subclass """)
+
+    @property
+    def columns(self):
+        """Columns in the view."""
+        raise Exception(""" Must be implemented in a subclass """)
+
+    def _chunk(self, codes, columns):
+        """Build the given columns for a chunk of integer codes."""
+        Map = self._Map
+        array = utils.codes_to_array(codes, Map.mutations,
+                                     wildtype=Map.wildtype)
+        rows = Map._index_of_codes(codes)
+        observed = rows >= 0
+
+        chunk = {}
+        binary = None
+        for column in columns:
+            if column == "genotypes":
+                chunk[column] = utils.array_to_genotypes(array)
+            elif column == "codes":
+                chunk[column] = codes
+            elif column in ("binary", "n_mutations"):
+                if binary is None:
+                    binary = utils.array_to_binary(array, Map.encoding_table)
+                if column == "binary":
+                    chunk[column] = np.array(utils.binary_to_strings(binary))
+                else:
+                    chunk[column] = binary.sum(axis=1, dtype=np.int64)
+            else:
+                # Observed values; NaN for genotypes missing from the map.
+                values = Map.data[column].to_numpy()
+                if values.dtype.kind in "biu":
+                    values = values.astype(float)
+                elif values.dtype.kind in "US":
+                    values = values.astype(object)
+                if len(values) > 0:
+                    filled = values[np.where(observed, rows, 0)]
+                else:
+                    filled = np.empty(len(codes), dtype=values.dtype)
+                filled[~observed] = np.nan
+                chunk[column] = filled
+        return chunk
+
+    def iter_column(self, column, chunksize=None):
+        """Iterate over chunks of a single column.
+
+        Yields
+        ------
+        values : numpy.ndarray
+            values of the column in each chunk.
+        """
+        chunksize = chunksize or self.chunksize
+        for codes in self._iter_codes(chunksize):
+            yield self._chunk(codes, [column])[column]
+
+    def iter_chunks(self, chunksize=None, columns=None):
+        """Iterate over the view in chunks.
+
+        Parameters
+        ----------
+        chunksize : int
+            number of genotypes per chunk.
+        columns : list
+            columns to include; all columns by default.
+
+        Yields
+        ------
+        chunk : pandas.DataFrame
+            rows of the view in each chunk.
+        """
+        chunksize = chunksize or self.chunksize
+        if columns is None:
+            columns = self.columns
+        for codes in self._iter_codes(chunksize):
+            yield pd.DataFrame(self._chunk(codes, columns), columns=columns)
+
+    def to_dataframe(self, columns=None):
+        """Materialize the view as a pandas.DataFrame."""
+        if columns is None:
+            columns = self.columns
+        chunks = list(self.iter_chunks(columns=columns))
+        if len(chunks) == 0:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    def to_dict(self, orient="list"):
+        """Materialize the view as a dictionary (see
+        `pandas.DataFrame.to_dict`)."""
+        return self.to_dataframe().to_dict(orient)
+
+    def _repr_html_(self):
+        """Represent the first chunk of the view as an html table."""
+        for chunk in self.iter_chunks(chunksize=10):
+            return chunk.to_html()
+        return pd.DataFrame(columns=self.columns).to_html()
+
+
+class CompleteDataView(BaseDataView):
+    """Data of a GenotypePhenotypeMap over its complete genotype space. Any
+    genotype missing from the map is reported with NaN values.
+    """
+
+    def __len__(self):
+        return self._Map.space.size
+
+    @property
+    def columns(self):
+        """Columns in the view; same as the map's data."""
+        return list(self._Map.data.columns)
+
+    def _iter_codes(self, chunksize):
+        size = self._Map.space.size
+        for start in range(0, size, chunksize):
+            yield np.arange(start, min(start + chunksize, size),
+                            dtype=np.int64)
+
+    def values(self, column):
+        """Values of a data column over the complete genotype space, as a
+        masked array ordered by integer code. Missing genotypes are masked.
+        """
+        Map = self._Map
+        values = np.asarray(Map.data[column].to_numpy())
+        out = np.ma.masked_all(Map.space.size, dtype=values.dtype)
+        out[Map.codes] = values
+        return out
+
+
+class MissingDataView(BaseDataView):
+    """Genotypes in the complete genotype space that are missing from a
+    GenotypePhenotypeMap.
+    """
+
+    def __len__(self):
+        return self._Map.space.size - len(np.unique(self._Map.codes))
+
+    @property
+    def columns(self):
+        """Columns in the view: 'genotypes' and (optional) 'binary'."""
+        if self._Map._include_binary:
+            return ["genotypes", "binary"]
+        return ["genotypes"]
+
+    def _iter_codes(self, chunksize):
+        Map = self._Map
+        for codes in utils.iter_missing_codes(Map.codes, Map.space.size,
+                                              chunksize=chunksize):
+            if len(codes) > 0:
+                yield codes
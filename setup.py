@@ -22,11 +22,16 @@ VERSION = None
 
 # What packages are required for this module to be executed?
 REQUIRED = [
-    "numpy",
+    "numpy>=1.17",
     "scipy",
     "pandas>=0.24.2"
 ]
 
+# What packages are optional?
+EXTRAS = {
+    "arrow": ["pyarrow"],
+}
+
 # The rest you shouldn't have to touch too much :)
 # ------------------------------------------------
 # Except, perhaps the License and Trove Classifiers!
@@ -98,6 +103,7 @@ setup(
     url=URL,
     packages=find_packages(exclude=('tests',)),
     install_requires=REQUIRED,
+    extras_require=EXTRAS,
     include_package_data=True,
     license='MIT',
     classifiers=[